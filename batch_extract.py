@@ -0,0 +1,114 @@
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import fitz  # PyMuPDF
+
+from pdf_table_extract import extraire_pdf_vers_excel
+
+
+# === Script : BATCH ENGINE - RUN extraire_pdf_vers_excel ON MANY PDF WITH A PROCESS POOL ===
+# = Every PDF (or page range of a big PDF) is a task sent to a worker process
+# = Progress messages are sent back through a queue so the Tk log can be fed from the main thread :
+#       ("debut", pdf_path, plage)
+#       ("fin", pdf_path, plage, target_pages, pages_sans_tableaux)
+#       ("erreur", pdf_path, plage, message)
+#   The end of the batch is not sent on the queue : the caller knows it when extraire_lot returns
+#
+def limiter_memoire_worker(memoire_max_mo):
+    # Memory cap per worker (address space) - only available on POSIX systems
+    if not memoire_max_mo:
+        return
+    try:
+        import resource
+    except ImportError:
+        print("⚠️ Limite mémoire par worker non supportée sur ce système.")
+        return
+    limite = int(memoire_max_mo) * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limite, limite))
+
+
+def decouper_taches(pdf_paths, pages_par_tache=None):
+    # One task per PDF, or one task per page range if the PDF is bigger than pages_par_tache
+    taches = []
+    for pdf_path in pdf_paths:
+        if not pages_par_tache:
+            taches.append((pdf_path, None))
+            continue
+
+        with fitz.open(pdf_path) as doc:
+            nb_pages = len(doc)
+
+        if nb_pages <= pages_par_tache:
+            taches.append((pdf_path, None))
+            continue
+
+        for debut in range(1, nb_pages + 1, pages_par_tache):
+            fin = min(debut + pages_par_tache - 1, nb_pages)
+            taches.append((pdf_path, (debut, fin)))
+    return taches
+
+
+def _traiter_tache(pdf_path, plage, output_dir, file_progression, format_sortie="xlsx"):
+    if file_progression is not None:
+        file_progression.put(("debut", pdf_path, plage))
+    try:
+        # Already one process per task : keyword classification kept in this worker
+        target_pages, pages_sans_tableaux = extraire_pdf_vers_excel(pdf_path, output_dir, plage_pages=plage,
+                                                                   format_sortie=format_sortie,
+                                                                   max_workers_classement=1)
+    except Exception as e:
+        if file_progression is not None:
+            file_progression.put(("erreur", pdf_path, plage, str(e)))
+        raise
+    if file_progression is not None:
+        file_progression.put(("fin", pdf_path, plage, target_pages, pages_sans_tableaux))
+    return target_pages, pages_sans_tableaux
+
+
+def extraire_lot(pdf_paths, output_dir, max_workers=None, memoire_max_mo=None,
+                 pages_par_tache=None, file_progression=None, format_sortie="xlsx"):
+    """
+    Lance extraire_pdf_vers_excel sur tous les PDF via un pool de processus.
+    file_progression doit pouvoir être transmise aux workers : multiprocessing.Manager().Queue()
+    Retourne une liste [(pdf_path, target_pages, pages_sans_tableaux, erreur)] dans l'ordre de pdf_paths,
+    les résultats des plages de pages d'un même PDF étant concaténés dans l'ordre des pages.
+    """
+    taches = decouper_taches(pdf_paths, pages_par_tache)
+    max_workers = max_workers or os.cpu_count() or 1
+    max_workers = max(1, min(max_workers, len(taches) or 1))
+
+    resultats_par_tache = {}
+    erreurs = {}
+
+    # max_tasks_per_child=1 (Python 3.11+) -> Camelot / pdfminer memory is given back after each task
+    options_pool = {}
+    if sys.version_info >= (3, 11):
+        options_pool["max_tasks_per_child"] = 1
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=limiter_memoire_worker,
+                             initargs=(memoire_max_mo,), **options_pool) as pool:
+        futures = {
+            pool.submit(_traiter_tache, pdf_path, plage, output_dir, file_progression, format_sortie):
+                (pdf_path, plage)
+            for pdf_path, plage in taches
+        }
+        for future in as_completed(futures):
+            tache = futures[future]
+            try:
+                resultats_par_tache[tache] = future.result()
+            except Exception as e:
+                erreurs.setdefault(tache[0], []).append(str(e))
+
+    resultats = []
+    for pdf_path in pdf_paths:
+        target_pages, pages_sans_tableaux = [], []
+        for tache in taches:
+            if tache[0] == pdf_path and tache in resultats_par_tache:
+                pages_ret, pages_vides = resultats_par_tache[tache]
+                target_pages += pages_ret
+                pages_sans_tableaux += pages_vides
+        erreur = " | ".join(erreurs[pdf_path]) if pdf_path in erreurs else None
+        resultats.append((pdf_path, target_pages, pages_sans_tableaux, erreur))
+
+    return resultats
@@ -0,0 +1,174 @@
+import os
+import sys
+import json
+import hashlib
+import argparse
+import tempfile
+import threading
+
+
+# === Script : ON-DISK CACHE (CONTENT ADDRESSED, LRU SIZE BOUNDED) ===
+# = One JSON file per entry, named by the sha256 of its key -> safe to share between processes
+# = LRU : the mtime of an entry is refreshed on every hit, the oldest entries are removed first
+# = Size tracked in memory by set() : the folder is only walked again when it goes over taille_max,
+#   and then pruned down to SEUIL_BAS x taille_max so the next writes have room before the next walk
+# = CLI :
+#       python disk_cache.py info
+#       python disk_cache.py prune --taille-max 200
+#       python disk_cache.py clear --namespace camelot
+#
+DOSSIER_CACHE = os.environ.get("EXTRACTPDF_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "extractpdf"))
+TAILLE_MAX_MO = 500
+SEUIL_BAS = 0.8
+
+_hash_fichiers = {}
+
+
+def hash_fichier(path):
+    # sha256 of the file content, kept in memory while size and mtime do not change
+    stat = os.stat(path)
+    signature = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if signature not in _hash_fichiers:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for bloc in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(bloc)
+        _hash_fichiers[signature] = h.hexdigest()
+    return _hash_fichiers[signature]
+
+
+class CacheDisque:
+    def __init__(self, namespace, dossier=None, taille_max_mo=TAILLE_MAX_MO):
+        self.dossier = os.path.join(dossier or DOSSIER_CACHE, namespace)
+        self.taille_max = int(taille_max_mo * 1024 * 1024) if taille_max_mo else None
+        self._taille = None
+        self._verrou = threading.Lock()  # size counter only, the files are written atomically
+        self._elagage = False
+        os.makedirs(self.dossier, exist_ok=True)
+
+    @staticmethod
+    def cle(*parties):
+        texte = json.dumps(parties, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(texte.encode("utf-8")).hexdigest()
+
+    def _chemin(self, cle):
+        return os.path.join(self.dossier, cle[:2], cle + ".json")
+
+    def get(self, cle):
+        chemin = self._chemin(cle)
+        try:
+            with open(chemin, encoding="utf-8") as f:
+                valeur = json.load(f)
+            os.utime(chemin)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return valeur
+
+    def set(self, cle, valeur):
+        chemin = self._chemin(cle)
+        os.makedirs(os.path.dirname(chemin), exist_ok=True)
+        try:
+            ancienne_taille = os.path.getsize(chemin)  # overwritten entry : not counted twice
+        except FileNotFoundError:
+            ancienne_taille = 0
+
+        # Atomic write : other processes never read half a file
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(chemin), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(valeur, f, ensure_ascii=False)
+        os.replace(tmp, chemin)
+
+        if not self.taille_max:
+            return
+        with self._verrou:
+            if self._taille is not None:
+                self._taille += os.path.getsize(chemin) - ancienne_taille
+                if self._taille <= self.taille_max:
+                    return
+            if self._elagage:
+                return  # another thread is already walking / pruning the folder
+            self._elagage = True
+
+        try:
+            if self._taille is None:
+                taille = self.info()["taille"]  # first write : size of what is already on disk
+                if taille <= self.taille_max:
+                    with self._verrou:
+                        self._taille = taille
+                    return
+            self.prune(int(self.taille_max * SEUIL_BAS))
+        finally:
+            self._elagage = False
+
+    def _entrees(self):
+        entrees = []
+        for dossier, _, fichiers in os.walk(self.dossier):
+            for nom in fichiers:
+                if not nom.endswith(".json"):
+                    continue
+                chemin = os.path.join(dossier, nom)
+                try:
+                    stat = os.stat(chemin)
+                except FileNotFoundError:
+                    continue
+                entrees.append((stat.st_mtime, stat.st_size, chemin))
+        return entrees
+
+    def info(self):
+        entrees = self._entrees()
+        return {"dossier": self.dossier, "entrees": len(entrees), "taille": sum(e[1] for e in entrees)}
+
+    def prune(self, taille_max=None):
+        # Removes the least recently used entries until the cache is under taille_max (bytes)
+        taille_max = self.taille_max if taille_max is None else taille_max
+        entrees = sorted(self._entrees())
+        taille = sum(e[1] for e in entrees)
+        supprimees = 0
+        for _, size, chemin in entrees:
+            if taille <= taille_max:
+                break
+            try:
+                os.remove(chemin)
+            except FileNotFoundError:
+                pass
+            taille -= size
+            supprimees += 1
+        with self._verrou:
+            self._taille = taille
+        return supprimees
+
+    def vider(self):
+        return self.prune(0)
+
+
+def _namespaces(dossier):
+    if not os.path.isdir(dossier):
+        return []
+    return sorted(n for n in os.listdir(dossier) if os.path.isdir(os.path.join(dossier, n)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspection / nettoyage du cache d'extraction")
+    parser.add_argument("action", choices=["info", "prune", "clear"])
+    parser.add_argument("--namespace", help="camelot, ocr... (défaut : tous)")
+    parser.add_argument("--dossier", default=DOSSIER_CACHE)
+    parser.add_argument("--taille-max", type=float, default=TAILLE_MAX_MO, help="Mo, pour prune")
+    args = parser.parse_args(argv)
+
+    namespaces = [args.namespace] if args.namespace else _namespaces(args.dossier)
+    if not namespaces:
+        print(f"Cache vide : {args.dossier}")
+        return
+
+    for namespace in namespaces:
+        cache = CacheDisque(namespace, dossier=args.dossier, taille_max_mo=None)
+        if args.action == "prune":
+            print(f"🧹 {namespace} : {cache.prune(int(args.taille_max * 1024 * 1024))} entrées supprimées")
+        elif args.action == "clear":
+            print(f"🗑️ {namespace} : {cache.vider()} entrées supprimées")
+        info = cache.info()
+        print(f"📦 {namespace} : {info['entrees']} entrées, {info['taille'] / 1024 / 1024:.1f} Mo ({info['dossier']})")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+import cv2
+import numpy as np
+
+
+# === Script : TABLE GRID DETECTION ON A DOWNSCALED IMAGE ===
+# = The ruling lines are found on an image reduced by FACTEUR_DETECTION (300 dpi page -> 75 dpi, 16x fewer pixels) :
+#   threshold, morphology and contours run on the small image, the boxes are then mapped back to full resolution
+# = Reduction by the min of each block (not an average) : a 1 px line at 300 dpi stays black in the small image
+# = Full resolution is only read again for the crops that go to OCR
+#
+FACTEUR_DETECTION = 4
+LONGUEUR_LIGNE = 40  # min length of a ruling line, in pixels of the full resolution image
+
+
+def reduire_min(gray, facteur=FACTEUR_DETECTION):
+    # Darkest pixel of each facteur x facteur block, without a full-size temporary image
+    if facteur <= 1:
+        return gray
+    hauteur = gray.shape[0] // facteur * facteur
+    largeur = gray.shape[1] // facteur * facteur
+
+    lignes = gray[0:hauteur:facteur, :largeur].copy()
+    for i in range(1, facteur):
+        np.minimum(lignes, gray[i:hauteur:facteur, :largeur], out=lignes)
+    petit = lignes[:, 0::facteur].copy()
+    for i in range(1, facteur):
+        np.minimum(petit, lignes[:, i::facteur], out=petit)
+    return petit
+
+
+def longueur_reduite(longueur_ligne, facteur):
+    # Odd kernel : with an even one the anchor is off-center and the opening shifts the lines
+    return max(3, round(longueur_ligne / facteur)) | 1
+
+
+def masques_lignes(gray, facteur=FACTEUR_DETECTION, seuil=180, longueur_ligne=LONGUEUR_LIGNE, iterations=2):
+    # (binary image, horizontal mask, vertical mask) at the reduced scale
+    petit = reduire_min(gray, facteur)
+    _, binary = cv2.threshold(petit, seuil, 255, cv2.THRESH_BINARY_INV)
+
+    longueur = longueur_reduite(longueur_ligne, facteur)
+    horizontal_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (longueur, 1))
+    vertical_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, longueur))
+    horizontal_lines = cv2.morphologyEx(binary, cv2.MORPH_OPEN, horizontal_kernel, iterations=iterations)
+    vertical_lines = cv2.morphologyEx(binary, cv2.MORPH_OPEN, vertical_kernel, iterations=iterations)
+    return binary, horizontal_lines, vertical_lines
+
+
+def vers_pleine_resolution(boxes, facteur, forme):
+    # Boxes (x, y, w, h) of the reduced image -> full resolution, clipped to the image
+    hauteur, largeur = forme[:2]
+    resultat = []
+    for x, y, w, h in boxes:
+        x0, y0 = x * facteur, y * facteur
+        x1, y1 = min(largeur, (x + w) * facteur), min(hauteur, (y + h) * facteur)
+        resultat.append((x0, y0, x1 - x0, y1 - y0))
+    return resultat
+
+
+def detecter_boites(gray, facteur=FACTEUR_DETECTION, seuil=180, longueur_ligne=LONGUEUR_LIGNE,
+                    mode=cv2.RETR_EXTERNAL, taille_min=(0, 0)):
+    """
+    Boîtes (x, y, w, h) en pleine résolution des contours du masque de lignes, détectées sur l'image réduite.
+    taille_min : (largeur, hauteur) minimales en pleine résolution.
+    """
+    _, horizontal_lines, vertical_lines = masques_lignes(gray, facteur, seuil, longueur_ligne)
+    table_mask = cv2.add(horizontal_lines, vertical_lines)
+
+    contours, _ = cv2.findContours(table_mask, mode, cv2.CHAIN_APPROX_SIMPLE)
+    boxes = vers_pleine_resolution([cv2.boundingRect(c) for c in contours], facteur, gray.shape)
+    return [b for b in boxes if b[2] > taille_min[0] and b[3] > taille_min[1]]
+
+
+# === Blank cells ===
+# = Cheap test on the binary image (ink = 255) before OCR : connected components that look like characters
+#   (not specks, not ruling fragments) and their ink density. No such ink -> empty value, no Tesseract call
+#
+AIRE_MIN_ENCRE = 16       # px at full resolution : smaller specks are noise
+RATIO_MAX_ENCRE = 15      # longer / thinner components are ruling fragments, not characters
+DENSITE_MIN_ENCRE = 0.0005
+
+
+def composantes_texte(binaire, aire_min=AIRE_MIN_ENCRE, ratio_max=RATIO_MAX_ENCRE):
+    # Stats (x, y, w, h, area) of the components kept as characters
+    _, _, stats, _ = cv2.connectedComponentsWithStats(binaire, connectivity=8)
+    stats = stats[1:]
+    largeur, hauteur, aire = stats[:, 2], stats[:, 3], stats[:, 4]
+    ratio = np.maximum(largeur, hauteur) / np.maximum(1, np.minimum(largeur, hauteur))
+    return stats[(aire >= aire_min) & (ratio <= ratio_max)]
+
+
+def est_vide(binaire, aire_min=AIRE_MIN_ENCRE, ratio_max=RATIO_MAX_ENCRE, densite_min=DENSITE_MIN_ENCRE):
+    if binaire.size == 0 or not binaire.any():
+        return True
+    stats = composantes_texte(binaire, aire_min, ratio_max)
+    return len(stats) == 0 or stats[:, 4].sum() / binaire.size < densite_min
+
+
+def image_vide(gray, seuil=180):
+    # Same test on a grayscale crop at full resolution (cell images saved on disk)
+    _, binaire = cv2.threshold(gray, seuil, 255, cv2.THRESH_BINARY_INV)
+    return est_vide(binaire)
+
+
+# === Row / column lattice from the ruling lines ===
+# = Line positions = runs of the projection profiles of the horizontal / vertical masks
+# = A cell boundary exists if the ruling line covers at least half of it, cells without boundary
+#   between them are merged (merged cells : nb_lignes / nb_colonnes > 1)
+# = Cell boxes = space between the lines (ruling lines not included in the crops)
+#
+def runs_profil(profil, longueur_min):
+    # [(start, end)] of the consecutive indices where the profile reaches longueur_min
+    idx = np.flatnonzero(profil >= longueur_min)
+    if not idx.size:
+        return []
+    coupures = np.flatnonzero(np.diff(idx) > 1)
+    debuts = np.r_[idx[0], idx[coupures + 1]]
+    fins = np.r_[idx[coupures], idx[-1]]
+    return list(zip(debuts.tolist(), fins.tolist()))
+
+
+def construire_grille(horizontal_lines, vertical_lines, longueur):
+    """
+    Cellules d'un tableau (masques réduits déjà recadrés sur le tableau) :
+    [{"box", "ligne", "colonne", "nb_lignes", "nb_colonnes"}], box à l'échelle réduite.
+    """
+    lignes_h = runs_profil((horizontal_lines > 0).sum(axis=1), longueur)
+    lignes_v = runs_profil((vertical_lines > 0).sum(axis=0), longueur)
+    if len(lignes_h) < 2 or len(lignes_v) < 2:
+        return []
+
+    nb_lignes, nb_colonnes = len(lignes_h) - 1, len(lignes_v) - 1
+    y0 = [lignes_h[i][1] + 1 for i in range(nb_lignes)]
+    y1 = [lignes_h[i + 1][0] for i in range(nb_lignes)]
+    x0 = [lignes_v[j][1] + 1 for j in range(nb_colonnes)]
+    x1 = [lignes_v[j + 1][0] for j in range(nb_colonnes)]
+
+    def couvert(masque, axe):
+        return masque.size and (masque > 0).any(axis=axe).mean() >= 0.5
+
+    # Union-find of the lattice cells without ruling line between them
+    parent = list(range(nb_lignes * nb_colonnes))
+
+    def racine(k):
+        while parent[k] != k:
+            parent[k] = parent[parent[k]]
+            k = parent[k]
+        return k
+
+    for i in range(nb_lignes):
+        for j in range(nb_colonnes):
+            if j + 1 < nb_colonnes:
+                debut, fin = lignes_v[j + 1]
+                if not couvert(vertical_lines[y0[i]:y1[i], max(0, debut - 1):fin + 2], 1):
+                    parent[racine(i * nb_colonnes + j)] = racine(i * nb_colonnes + j + 1)
+            if i + 1 < nb_lignes:
+                debut, fin = lignes_h[i + 1]
+                if not couvert(horizontal_lines[max(0, debut - 1):fin + 2, x0[j]:x1[j]], 0):
+                    parent[racine(i * nb_colonnes + j)] = racine((i + 1) * nb_colonnes + j)
+
+    groupes = {}
+    for k in range(nb_lignes * nb_colonnes):
+        groupes.setdefault(racine(k), []).append(divmod(k, nb_colonnes))
+
+    cellules = []
+    for membres in groupes.values():
+        i_min, i_max = min(i for i, _ in membres), max(i for i, _ in membres)
+        j_min, j_max = min(j for _, j in membres), max(j for _, j in membres)
+        box = (x0[j_min], y0[i_min], x1[j_max] - x0[j_min], y1[i_max] - y0[i_min])
+        if box[2] <= 0 or box[3] <= 0:
+            continue
+        cellules.append({
+            "box": box,
+            "ligne": i_min,
+            "colonne": j_min,
+            "nb_lignes": i_max - i_min + 1,
+            "nb_colonnes": j_max - j_min + 1,
+        })
+    return sorted(cellules, key=lambda c: (c["ligne"], c["colonne"]))
+
+
+def detecter_grilles(gray, facteur=FACTEUR_DETECTION, seuil=180, longueur_ligne=LONGUEUR_LIGNE):
+    """
+    Tableaux de la page, de haut en bas : une liste de cellules par tableau, boîtes en pleine résolution.
+    Chaque cellule porte "vide" : pas d'encre de texte dedans, inutile de l'envoyer à l'OCR.
+    """
+    binary, horizontal_lines, vertical_lines = masques_lignes(gray, facteur, seuil, longueur_ligne)
+    table_mask = cv2.add(horizontal_lines, vertical_lines)
+    encre = cv2.subtract(binary, table_mask)
+    aire_min = max(3, AIRE_MIN_ENCRE // (facteur * facteur))  # min pooling turns a 1 px speck into a full pixel
+    longueur = longueur_reduite(longueur_ligne, facteur)
+
+    contours, _ = cv2.findContours(table_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    regions = sorted((cv2.boundingRect(c) for c in contours), key=lambda b: (b[1], b[0]))
+
+    tableaux = []
+    for rx, ry, rw, rh in regions:
+        if rw < 2 * longueur or rh < 2 * longueur:
+            continue
+        cellules = construire_grille(horizontal_lines[ry:ry + rh, rx:rx + rw],
+                                     vertical_lines[ry:ry + rh, rx:rx + rw], longueur)
+        if not cellules:
+            continue
+        boxes = [(x + rx, y + ry, w, h) for x, y, w, h in (c["box"] for c in cellules)]
+        for cellule, (x, y, w, h) in zip(cellules, boxes):
+            cellule["vide"] = est_vide(encre[y:y + h, x:x + w], aire_min=aire_min)
+        for cellule, box in zip(cellules, vers_pleine_resolution(boxes, facteur, gray.shape)):
+            cellule["box"] = box
+        tableaux.append(cellules)
+    return tableaux
+
+
+def empiler_tableaux(tableaux):
+    # Tables of a page put one under the other : a single list of cells, rows renumbered
+    cellules = []
+    decalage = 0
+    for tableau in tableaux:
+        for c in tableau:
+            c["ligne"] += decalage
+            cellules.append(c)
+        decalage = max(c["ligne"] + c["nb_lignes"] for c in cellules)
+    return cellules
@@ -1,5 +1,4 @@
 import os
-import io
 import re
 import fitz  # PyMuPDF
 import cv2
@@ -10,174 +9,351 @@ from PIL import Image
 pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
 
 import pandas as pd
-from pandas import ExcelWriter
+
+from grid_detect import detecter_grilles, empiler_tableaux, image_vide
+from ocr_backend import obtenir_backend
+from ocr_pipeline import executer_pipeline
+from ocr_pool import executeur_partage
+from ocr_words import (NB_ECHANTILLON_NUMERIQUE, SEUIL_CONFIANCE, assigner_mots_cellules, colonnes_numeriques,
+                       confiance_min, config_numerique, ocr_cascade, ocr_grille_bandes, ocr_mots, texte_des_mots,
+                       typer_cellules)
+from table_export import ouvrir_export
+from table_normalize import normaliser_grille
 
 
 # === Script : EXTRACT TABLE FROM IMAGE USING OCR ===
 # ================= TESTS
 #
-def traiter_tableaux_image(pdf_path, page_nums, output_dir):
+# = Page rendering straight to NumPy : the array wraps pix.samples (no PNG encode / decode, no copy)
+#   The pixmap owns the memory -> keep pix referenced as long as the image is used
+#
+def rendre_page(page, dpi=300, gris=False):
+    colorspace = fitz.csGRAY if gris else fitz.csRGB
+    pix = page.get_pixmap(dpi=dpi, colorspace=colorspace, alpha=False)
+
+    forme = (pix.height, pix.width) if pix.n == 1 else (pix.height, pix.width, pix.n)
+    strides = (pix.stride, 1) if pix.n == 1 else (pix.stride, pix.n, 1)
+    image = np.ndarray(forme, dtype=np.uint8, buffer=pix.samples_mv, strides=strides)
+    return image, pix
+
+
+# = Lines of the OCR text -> cells split on 2+ spaces
+#
+def texte_vers_tableau(ocr_text):
+    lignes = ocr_text.strip().split("\n")
+    lignes = [l for l in lignes if l.strip()]
+    tableau = [re.split(r"\s{2,}", ligne.strip()) for ligne in lignes]
+    return normaliser_grille(tableau)
+
+
+# = Tk progress window usable as progression callback : progression(done, total)
+# = Closed when done >= total, and by progression.fermer() (caller's finally : nothing to do, error...)
+#
+def fenetre_progression(titre, texte):
+    import tkinter as tk
+    from tkinter import ttk
+
+    progress_win = tk.Toplevel()
+    progress_win.title(titre)
+    tk.Label(progress_win, text=texte).pack(padx=10, pady=5)
+    progress_label = tk.Label(progress_win, text="Initialisation...")
+    progress_label.pack()
+    progress_bar = ttk.Progressbar(progress_win, length=300, mode="determinate")
+    progress_bar.pack(padx=10, pady=10)
+    progress_win.update()
+
+    def fermer():
+        if progress_win.winfo_exists():
+            progress_win.destroy()
+
+    def progression(fait, total):
+        if not progress_win.winfo_exists():
+            return
+        progress_bar["maximum"] = total or 1
+        progress_bar["value"] = fait
+        progress_label.config(text=f"Traitement : {fait}/{total}")
+        progress_win.update()
+        if fait >= total:
+            fermer()
+
+    progression.fermer = fermer
+    return progression
+
+
+# = format_sortie : "xlsx" or "parquet" (read directly by mapping_tool)
+# = Pages rendered in the calling thread (PyMuPDF is not thread-safe), OCR spread on the shared OCR pool
+#
+def traiter_tableaux_image(pdf_path, page_nums, output_dir, format_sortie="xlsx", progression=None):
     pdf_name = os.path.splitext(os.path.basename(pdf_path))[0]
-    output_file = os.path.join(output_dir, f"{pdf_name}_tables_image.xlsx")
+    output_file = os.path.join(output_dir, f"{pdf_name}_tables_image.{format_sortie}")
 
     pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
 
     doc = fitz.open(pdf_path)
-    image_tables = []
-
-    for page_num in page_nums:
+    export = ouvrir_export(output_file, source=os.path.basename(pdf_path))
+
+    def pages_rendues():
+        for page_num in page_nums:
+            try:
+                page = doc.load_page(page_num - 1)  # Pages sont 0-indexées dans fitz
+                yield page_num, rendre_page(page, dpi=300, gris=True), None
+            except Exception as e:
+                yield page_num, None, e
+
+    def ocr_page(element):
+        page_num, rendu, erreur = element
+        if erreur is not None:
+            return page_num, None, erreur
         try:
-            page = doc.load_page(page_num - 1)  # Pages sont 0-indexées dans fitz
-            pix = page.get_pixmap(dpi=300)
-            img_data = pix.tobytes("png")
-            image = Image.open(io.BytesIO(img_data))
-
-            ocr_text = pytesseract.image_to_string(image, lang='fra')
-
-            lignes = ocr_text.strip().split("\n")
-            lignes = [l for l in lignes if l.strip()]
-            tableau = [re.split(r"\s{2,}", ligne.strip()) for ligne in lignes]
+            image, pix = rendu
+            return page_num, obtenir_backend().texte(image, lang='fra'), None
+        except Exception as e:
+            return page_num, None, e
 
-            max_len = max(len(row) for row in tableau)
-            tableau = [row + [""] * (max_len - len(row)) for row in tableau]
+    resultats = executeur_partage().map(ocr_page, pages_rendues(), progression=progression, total=len(page_nums))
 
-            df = pd.DataFrame(tableau)
-            sheet_name = f"Page{page_num}_image"
-            image_tables.append((sheet_name, df))
+    for page_num, ocr_text, erreur in resultats:
+        try:
+            if erreur is not None:
+                raise erreur
+            df = texte_vers_tableau(ocr_text)
+            export.ajouter_feuille(f"Page{page_num}_image", df, page=page_num, mot_cle="image")
         except Exception as e:
             print(f"❌ Erreur OCR page {page_num} : {e}")
 
-    if image_tables:
-        with ExcelWriter(output_file, engine="openpyxl") as writer:
-            for name, df in image_tables:
-                df.to_excel(writer, sheet_name=name, index=False)
+    if export.fermer():
         print(f"✅ Export tableaux OCR : {output_file}")
     else:
         print("❌ Aucun tableau image extrait")
 
 # Logic from https://livefiredev.com/how-to-extract-table-from-image-in-python-opencv-ocr/
 # Using openCV + pysseract
-def detecter_tableaux_par_image(pdf_path, page_nums, output_dir=None):
-    from pytesseract import image_to_string
-    tableaux = []
+# = In-memory cell pipeline : detection -> cells (crop + grid position) -> OCR -> table, no PNG on disk
+#   dossier_debug : cell crops also written there (debug only)
+#
+def detecter_cellules(gray):
+    # Row / column lattice rebuilt from the ruling lines (grid_detect), merged cells included
+    # Several tables on the page : stacked one under the other in the same sheet
+    cellules = empiler_tableaux(detecter_grilles(gray, seuil=180))
+    for c in cellules:
+        x, y, w, h = c["box"]
+        c["image"] = gray[y:y + h, x:x + w]  # view on the page, no copy
+    return cellules
+
+
+# = mode_ocr : "page"    -> one image_to_data pass on the table region, words given to the cells
+#              "ligne"   -> one pass per row strip of the grid (--psm 6, rulings erased)
+#              "cellule" -> one Tesseract call per cell
+#   In "page" / "ligne" mode, per-cell OCR only for the cells with a low confidence, the cells with ink
+#   but no word given by the pass (as test_ocr), and the cells spanning several rows
+#   Blank cells (no ink, see grid_detect.est_vide) are never OCR'd
+# = typage : columns found numeric on their first cells are read with a digit whitelist
+#   (one strip per column in "ligne" mode, --psm 7 per cell otherwise), values parsed to float
+#
+def ocr_cellules(gray, cellules, mode_ocr="page", progression=None, typage=True):
+    backend = obtenir_backend()
+    pool = executeur_partage()
+
+    def ocr_cellule(cellule, config="--psm 6"):
+        return backend.texte(cellule["image"], lang="fra", config=config).strip()
+
+    boxes = [c["box"] for c in cellules]
+    vides = sum(1 for c in cellules if c.get("vide"))
+    mots_par_cellule = {}
+    couvertes = set()
+    lues = set()
+    numeriques = None
+    if mode_ocr == "page" and vides < len(cellules):
+        # Single OCR pass on the region covering all the cells
+        x0 = min(b[0] for b in boxes)
+        y0 = min(b[1] for b in boxes)
+        x1 = max(b[0] + b[2] for b in boxes)
+        y1 = max(b[1] + b[3] for b in boxes)
+        mots = ocr_mots(gray[y0:y1, x0:x1], lang="fra", decalage=(x0, y0))
+        mots_par_cellule = assigner_mots_cellules(mots, boxes)
+        couvertes = set(range(len(cellules)))
+    elif mode_ocr == "ligne":
+        mots_par_cellule, couvertes, numeriques = ocr_grille_bandes(gray, cellules, typage=typage, mapper=pool.map)
+    elif mode_ocr == "cellule" and typage:
+        # Sample read with the full model : first cells of each column
+        lues = {i for i, c in enumerate(cellules) if not c.get("vide") and c["ligne"] <= NB_ECHANTILLON_NUMERIQUE}
+        for i_box, texte in zip(sorted(lues), pool.map(ocr_cellule, [cellules[i] for i in sorted(lues)])):
+            cellules[i_box]["texte"] = texte
+
+    a_relire = []
+    for i_box, cellule in enumerate(cellules):
+        mots_cellule = mots_par_cellule.get(i_box, [])
+        if cellule.get("vide"):
+            cellule["texte"] = ""  # no ink : empty value without OCR
+        elif i_box in lues:
+            continue
+        elif i_box in couvertes and mots_cellule and confiance_min(mots_cellule) >= SEUIL_CONFIANCE:
+            cellule["texte"] = texte_des_mots(mots_cellule)
+        else:
+            cellule.pop("texte", None)
+            a_relire.append(cellule)
+    if numeriques is None:
+        numeriques = colonnes_numeriques(cellules) if typage else set()
+
+    # Per-cell OCR spread on the shared OCR pool
+    def relire(cellule):
+        numerique = cellule["colonne"] in numeriques and cellule.get("nb_colonnes", 1) == 1
+        return ocr_cellule(cellule, config_numerique() if numerique else "--psm 6")
+
+    textes = pool.map(relire, a_relire, progression=progression)
+    for cellule, texte in zip(a_relire, textes):
+        cellule["texte"] = texte
+    typer_cellules(cellules, numeriques)
+
+    if mode_ocr != "cellule":
+        print(f"   {len(cellules)} cellules, {vides} vides, "
+              f"{len(a_relire)} relues individuellement (confiance < {SEUIL_CONFIANCE} ou sans mot)")
+    else:
+        print(f"   {len(cellules)} cellules, {vides} vides non envoyées à l'OCR")
+    if numeriques:
+        print(f"   Colonnes numériques : {sorted(numeriques)}")
+    return cellules
 
-    for page_num in page_nums:
-        print(f"🔎 Traitement OCR structuré page {page_num}")
-        doc = fitz.open(pdf_path)
-        page = doc.load_page(page_num - 1)  # 0-indexé
 
-        pix = page.get_pixmap(dpi=300)
-        img_data = pix.tobytes("png")
-        image = Image.open(io.BytesIO(img_data))
-        img_cv = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
-        gray = cv2.cvtColor(img_cv, cv2.COLOR_BGR2GRAY)
+def assembler_tableau(cellules):
+    # Merged cell : text in its top-left cell, the other covered cells left empty
+    nb_lignes = max((c["ligne"] + c.get("nb_lignes", 1) for c in cellules), default=0)
+    nb_colonnes = max((c["colonne"] + c.get("nb_colonnes", 1) for c in cellules), default=0)
+    grille = [[""] * nb_colonnes for _ in range(nb_lignes)]
+    for c in cellules:
+        grille[c["ligne"]][c["colonne"]] = c.get("valeur", c.get("texte", ""))
+    return pd.DataFrame(grille)
 
-        _, binary = cv2.threshold(gray, 180, 255, cv2.THRESH_BINARY_INV)
 
-        horizontal_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (40, 1))
-        vertical_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, 40))
-        horizontal_lines = cv2.morphologyEx(binary, cv2.MORPH_OPEN, horizontal_kernel, iterations=2)
-        vertical_lines = cv2.morphologyEx(binary, cv2.MORPH_OPEN, vertical_kernel, iterations=2)
-        table_mask = cv2.add(horizontal_lines, vertical_lines)
+def sauver_cellules(cellules, dossier, prefixe):
+    for c in cellules:
+        x, y, _, _ = c["box"]
+        cv2.imwrite(os.path.join(dossier, f"{prefixe}_x{x}_y{y}.png"), c["image"])
 
-        contours, _ = cv2.findContours(table_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        boxes = sorted([cv2.boundingRect(c) for c in contours], key=lambda b: (b[1], b[0]))
 
-        lignes = []
-        for x, y, w, h in boxes:
-            cell_img = img_cv[y:y + h, x:x + w]
-            cell_gray = cv2.cvtColor(cell_img, cv2.COLOR_BGR2GRAY)
-            text = image_to_string(cell_gray, lang="fra", config="--psm 6").strip()
-            lignes.append((y, x, text))  # pour trier ensuite
+# = Pipeline (ocr_pipeline) : rendering (PyMuPDF, one thread) -> detection (OpenCV) -> OCR (Tesseract)
+#   -> export in the calling thread, stages linked by bounded queues : pages overlap, memory stays flat
+#
+NB_THREADS_DETECTION = 2
+NB_THREADS_OCR = 2  # pages OCR'd at the same time, their cells / strips go to the shared OCR pool
 
-            cv2.rectangle(img_cv, (x, y), (x + w, y + h), (0, 255, 0), 1)
 
-            if output_dir:
-                img_name = f"{os.path.splitext(os.path.basename(pdf_path))[0]}_page{page_num}_x{x}_y{y}.png"
-                img_path = os.path.join(output_dir, img_name)
-                cv2.imwrite(img_path, cell_img)
+def detecter_tableaux_par_image(pdf_path, page_nums, output_dir=None, format_sortie="xlsx", mode_ocr="page",
+                                dossier_debug=None, progression=None):
+    """
+    Détection des cellules + OCR en mémoire, un tableau par page.
+    Avec output_dir : export {pdf}_ocr_tables.{format_sortie} et retourne les noms des feuilles,
+    sinon retourne [(feuille, DataFrame)].
+    """
+    pdf_name = os.path.splitext(os.path.basename(pdf_path))[0]
+    export = None
+    if output_dir:
+        output_file = os.path.join(output_dir, f"{pdf_name}_ocr_tables.{format_sortie}")
+        export = ouvrir_export(output_file, source=os.path.basename(pdf_path))
 
-        lignes.sort()
-        texte_organise = [t[2] for t in lignes]
-        n = max(1, len(texte_organise) // 5)  # devine ~5 colonnes
-        tableau_final = [texte_organise[i:i + n] for i in range(0, len(texte_organise), n)]
+    doc = fitz.open(pdf_path)
 
-        df = pd.DataFrame(tableau_final)
-        tableaux.append((f"Page{page_num}_image", df))
+    # Single rendering thread : PyMuPDF is not thread-safe
+    def rendu(page_num):
+        # Rendered directly in grayscale : only the crops are read afterwards
+        print(f"🔎 Traitement OCR structuré page {page_num}")
+        page = doc.load_page(page_num - 1)  # 0-indexé
+        gray, pix = rendre_page(page, dpi=300, gris=True)
+        return {"page": page_num, "gray": gray, "pix": pix}
+
+    def detection(element):
+        element["cellules"] = detecter_cellules(element["gray"])
+        if dossier_debug:
+            sauver_cellules(element["cellules"], dossier_debug, f"{pdf_name}_page{element['page']}")
 
         # ==================== DEBUG ==========================
+        # img_cv = cv2.cvtColor(element["gray"], cv2.COLOR_GRAY2BGR)
+        # for c in element["cellules"]:
+        #     x, y, w, h = c["box"]
+        #     cv2.rectangle(img_cv, (x, y), (x + w, y + h), (0, 255, 0), 1)
         # plt.figure(figsize=(20, 10))
         # plt.imshow(cv2.cvtColor(img_cv, cv2.COLOR_BGR2RGB))
-        # plt.title(f"Détection cellules - Page {page_num}")
+        # plt.title(f"Détection cellules - Page {element['page']}")
         # plt.axis("off")
         # plt.show()
+        return element
 
+    def ocr(element):
+        ocr_cellules(element["gray"], element["cellules"], mode_ocr=mode_ocr)
+        # The page image is released here, only the table goes on
+        return assembler_tableau(element["cellules"])
 
-    if output_dir and tableaux:
-        output_file = os.path.join(output_dir, f"{os.path.basename(pdf_path).split('.')[0]}_tableaux_image_test.xlsx")
-        with pd.ExcelWriter(output_file, engine="openpyxl") as writer:
-            for name, df in tableaux:
-                df.to_excel(writer, sheet_name=name, index=False)
+    # A page that fails at any stage is skipped by the next ones, its error comes with the result
+    tableaux = []
+    etapes = [(rendu, 1), (detection, NB_THREADS_DETECTION), (ocr, NB_THREADS_OCR)]
+    resultats = executer_pipeline(page_nums, etapes)
+    for fait, (page_num, (df, erreur)) in enumerate(zip(page_nums, resultats), start=1):
+        if erreur is not None:
+            print(f"❌ Erreur OCR structuré page {page_num} : {erreur}")
+        else:
+            feuille = f"Page{page_num}_image"
+            if export is not None:
+                tableaux.append(export.ajouter_feuille(feuille, df, page=page_num, mot_cle="image"))
+            else:
+                tableaux.append((feuille, df))
+        if progression is not None:
+            progression(fait, len(page_nums))
+
+    if export is not None and export.fermer():
         print(f"✅ Export des tableaux OCR dans : {output_file}")
+    return tableaux
 
-    ocr_output = os.path.join(output_dir, f"{os.path.basename(pdf_path).split('.')[0]}_ocr_tables.xlsx")
-    tableaux_output_dir = output_dir
-    ocr_sur_images_decoupees(tableaux_output_dir, ocr_output, zoom_factor=2)
-
-
-def ocr_sur_images_decoupees(dossier_images, output_file=None, zoom_factor=2):
-    import tkinter as tk
-    from tkinter import ttk
 
+# = output_file : .xlsx or .parquet
+# = Images OCR'd on the shared OCR pool, progression(done, total) callback (see fenetre_progression)
+# = Cascade : OCR at native resolution first, only the images with a low word confidence
+#   are read again zoomed (LANCZOS x zoom_factor), then zoomed + binarized (Otsu)
+#
+def ocr_sur_images_decoupees(dossier_images, output_file=None, zoom_factor=2, progression=None):
+    # With an output file the sheets are streamed and only their names are returned
     tableaux = []
-    images = [f for f in os.listdir(dossier_images) if f.lower().endswith(".png")]
+    export = ouvrir_export(output_file, source=dossier_images) if output_file else None
+    images = sorted(f for f in os.listdir(dossier_images) if f.lower().endswith(".png"))
 
     if not images:
         print("❌ Aucun fichier image trouvé pour OCR.")
         return []
 
-    # Test progress bar
-    progress_win = tk.Toplevel()
-    progress_win.title("Traitement OCR")
-    tk.Label(progress_win, text="OCR des tableaux en cours...").pack(padx=10, pady=5)
-    progress_label = tk.Label(progress_win, text="Initialisation...")
-    progress_label.pack()
-    progress_bar = ttk.Progressbar(progress_win, length=300, mode="determinate", maximum=len(images))
-    progress_bar.pack(padx=10, pady=10)
-    progress_win.update()
-
-    for i, image_file in enumerate(sorted(images), start=1):
-        image_path = os.path.join(dossier_images, image_file)
-        image = Image.open(image_path)
-
+    def zoom(image):
         new_size = (image.width * zoom_factor, image.height * zoom_factor)
-        image_zoomed = image.resize(new_size, Image.Resampling.LANCZOS)
+        return image.resize(new_size, Image.Resampling.LANCZOS)
 
-        ocr_text = pytesseract.image_to_string(image_zoomed, lang='fra')
+    def zoom_binaire(image):
+        _, binaire = cv2.threshold(np.asarray(zoom(image)), 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        return binaire
 
-        lignes = ocr_text.strip().split("\n")
-        lignes = [l for l in lignes if l.strip()]
-        tableau = [re.split(r"\s{2,}", ligne.strip()) for ligne in lignes]
+    etapes = [
+        (zoom, {"zoom": zoom_factor, "resample": "lanczos"}, zoom_factor),
+        (zoom_binaire, {"zoom": zoom_factor, "resample": "lanczos", "binarisation": "otsu"}, zoom_factor),
+    ]
 
-        max_len = max((len(row) for row in tableau), default=0)
-        tableau = [row + [""] * (max_len - len(row)) for row in tableau]
+    # Blank crops skipped, (texte, cascade step kept : 0 = native, None = blank)
+    def ocr_image(image_file):
+        image = Image.open(os.path.join(dossier_images, image_file)).convert("L")
+        if image_vide(np.asarray(image)):
+            return "", None
+        mots, etape = ocr_cascade(image, etapes, lang='fra')
+        return texte_des_mots(mots, espacer_colonnes=True), etape
 
-        df = pd.DataFrame(tableau)
-        feuille = os.path.splitext(image_file)[0]
-        tableaux.append((feuille, df))
-
-        progress_label.config(text=f"Traitement : {image_file} ({i}/{len(images)})")
-        progress_bar["value"] = i
-        progress_win.update()
-
-    progress_win.destroy()
+    resultats = executeur_partage().map(ocr_image, images, progression=progression)
 
-
-
-    if output_file:
-        with ExcelWriter(output_file, engine="openpyxl") as writer:
-            for feuille, df in tableaux:
-                df.to_excel(writer, sheet_name=feuille[:31], index=False)
+    for image_file, (ocr_text, _) in zip(images, resultats):
+        df = texte_vers_tableau(ocr_text)
+        feuille = os.path.splitext(image_file)[0]
+        if export is not None:
+            tableaux.append(export.ajouter_feuille(feuille, df, mot_cle="image"))
+        else:
+            tableaux.append((feuille, df))
+
+    etapes_retenues = [etape for _, etape in resultats]
+    print(f"   {len(images)} images : {etapes_retenues.count(None)} vides, {etapes_retenues.count(0)} en natif, "
+          f"{sum(1 for e in etapes_retenues if e)} relues zoomées")
+    if export is not None and export.fermer():
         print(f"✅ OCR terminé. Résultat : {output_file}")
 
-    return tableaux
\ No newline at end of file
+    return tableaux
@@ -0,0 +1,119 @@
+import os
+import re
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+import fitz  # PyMuPDF
+
+
+# === Script : KEYWORD PAGE CLASSIFIER ===
+# = All the variants of all the keywords are compiled in one regex -> one pass on the text of each page
+# = Every canonical class found is reported with its positions (not only the first one)
+# = Keyword table can be loaded from a JSON file : {"Essai laboratoire": ["essai laboratoire", ...], ...}
+#
+MOTS_CLES_DEFAUT = {
+    "Essai laboratoire": ["essai laboratoire", "essais laboratoire", "essais laboratoires", "laboratoire", "laboratoires"],
+    "Essais in situ": ["essai in situ", "essais in situ", "in situ", "insitu", "in-situ"],
+    "Commentaire": ["commentaire", "commentaires"],
+    "Problématique": ["problématique", "problématiques"],
+}
+
+# Config file used if it exists next to the scripts
+FICHIER_MOTS_CLES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mots_cles.json")
+
+# Under this number of pages the pages are classified in the current process
+SEUIL_PAGES_PARALLELE = 500
+
+
+def charger_mots_cles(chemin=None):
+    chemin = chemin or FICHIER_MOTS_CLES
+    if not os.path.exists(chemin):
+        return dict(MOTS_CLES_DEFAUT)
+
+    with open(chemin, encoding="utf-8") as f:
+        mots_cles = json.load(f)
+
+    if not isinstance(mots_cles, dict) or not all(isinstance(v, list) for v in mots_cles.values()):
+        raise ValueError(f"Format de mots-clés invalide dans {chemin} : attendu {{classe: [variantes]}}")
+    for classe, variantes in mots_cles.items():
+        # An empty variant would match everywhere (empty regex alternative)
+        if not variantes or not all(isinstance(v, str) and v.strip() for v in variantes):
+            raise ValueError(f"Variantes vides pour la classe '{classe}' dans {chemin}")
+    return mots_cles
+
+
+class ClassifieurMotsCles:
+    def __init__(self, mots_cles=None):
+        self.mots_cles = mots_cles or dict(MOTS_CLES_DEFAUT)
+        self.ordre_classes = list(self.mots_cles)
+
+        # A variant shared by two classes belongs to the first one (same as the previous nested loop)
+        self.variante_vers_classe = {}
+        # Empty variants skipped (classes without any variant never found)
+        for canonical, variants in self.mots_cles.items():
+            for variant in variants:
+                if variant.strip():
+                    self.variante_vers_classe.setdefault(variant.lower(), canonical)
+
+        # Lookahead -> matches can overlap, longest variant first at each position
+        variantes = sorted(self.variante_vers_classe, key=len, reverse=True)
+        self.regex = re.compile("(?=(" + "|".join(re.escape(v) for v in variantes) + "))") if variantes else None
+
+    def trouver(self, text):
+        # [(canonical, variant, start, end)] in text order
+        if self.regex is None:
+            return []
+        text = text.lower()
+        correspondances = []
+        for m in self.regex.finditer(text):
+            variant = m.group(1)
+            correspondances.append((self.variante_vers_classe[variant], variant, m.start(1), m.end(1)))
+        return correspondances
+
+    def classes(self, correspondances):
+        # {canonical: [(start, end), ...]} in the order of the keyword table
+        positions = {}
+        for canonical, _, start, end in correspondances:
+            positions.setdefault(canonical, []).append((start, end))
+        return {c: positions[c] for c in self.ordre_classes if c in positions}
+
+    def classe_principale(self, correspondances):
+        # First class of the keyword table found in the page
+        trouvees = {c for c, _, _, _ in correspondances}
+        return next((c for c in self.ordre_classes if c in trouvees), None)
+
+
+def _classer_bloc(pdf_path, indices, mots_cles):
+    classifieur = ClassifieurMotsCles(mots_cles)
+    resultats = []
+    with fitz.open(pdf_path) as doc:
+        for i in indices:
+            resultats.append((i + 1, classifieur.trouver(doc.load_page(i).get_text())))
+    return resultats
+
+
+def classer_pages(pdf_path, classifieur, plage_pages=None, max_workers=None):
+    """
+    Retourne [(num_page, correspondances)] pour chaque page (1-indexé) dans l'ordre du document.
+    Au-delà de SEUIL_PAGES_PARALLELE pages, les pages sont réparties sur un pool de processus.
+    """
+    with fitz.open(pdf_path) as doc:
+        nb_pages = len(doc)
+
+    if plage_pages:
+        indices = list(range(max(plage_pages[0], 1) - 1, min(plage_pages[1], nb_pages)))
+    else:
+        indices = list(range(nb_pages))
+
+    max_workers = max_workers or os.cpu_count() or 1
+    if len(indices) < SEUIL_PAGES_PARALLELE or max_workers == 1:
+        return _classer_bloc(pdf_path, indices, classifieur.mots_cles)
+
+    taille_bloc = -(-len(indices) // max_workers)
+    blocs = [indices[i:i + taille_bloc] for i in range(0, len(indices), taille_bloc)]
+
+    resultats = []
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        for bloc in pool.map(_classer_bloc, [pdf_path] * len(blocs), blocs, [classifieur.mots_cles] * len(blocs)):
+            resultats += bloc
+    return resultats
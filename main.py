@@ -1,16 +1,19 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext, simpledialog, ttk
 import os
+import queue
 import threading
+import multiprocessing
 
-from image_table_extract import ocr_sur_images_decoupees, traiter_tableaux_image, detecter_tableaux_par_image
-from pdf_table_extract import  extraire_pdf_vers_excel
+from image_table_extract import traiter_tableaux_image, detecter_tableaux_par_image, fenetre_progression
+from batch_extract import extraire_lot
 from mapping_tool import appliquer_mapping_rapide
 
 
 
 # === Script : UI to help users choose from extract or direct mapping ===
 # == v2 : Ask users to check for table in images format
+# == v3 : PDF extraction sent to a process pool (batch_extract), log fed through a queue
 #
 def lancer_extraction():
     pdf_paths = list(pdf_listbox.get(0, tk.END))
@@ -21,25 +24,72 @@ def lancer_extraction():
         messagebox.showwarning("Aucun dossier", "Veuillez choisir un dossier de sortie.")
         return
 
+    try:
+        max_workers = int(nb_workers.get())
+    except ValueError:
+        max_workers = None
+    try:
+        memoire_max_mo = int(memoire_worker.get()) if memoire_worker.get().strip() else None
+    except ValueError:
+        memoire_max_mo = None
+    output_dir = dossier_sortie.get()
+    format_sortie = "parquet" if sortie_parquet.get() else "xlsx"
+
     resultat = []
+    # Manager process of the queue : stopped once the "termine" message is read
+    manager = multiprocessing.Manager()
+    file_progression = manager.Queue()
 
     def traitement():
-        for pdf_path in pdf_paths:
-            nom_fichier = os.path.basename(pdf_path)
-            log.insert(tk.END, f"📄 Traitement : {nom_fichier}\n")
+        try:
+            resultats_lot = extraire_lot(pdf_paths, output_dir, max_workers=max_workers,
+                                         memoire_max_mo=memoire_max_mo, pages_par_tache=PAGES_PAR_TACHE,
+                                         file_progression=file_progression, format_sortie=format_sortie)
+        except Exception as e:
+            file_progression.put(("erreur", "", None, e))
+            resultats_lot = []
+
+        # Page ranges that failed are already logged one by one : the others are kept
+        for pdf_path, pages_ret, pages_sans_tableaux, erreur in resultats_lot:
+            print("DEBUG - Pages sans tableau :", pages_sans_tableaux)
+            resultat.append((pdf_path, pages_ret, pages_sans_tableaux, erreur))
+
+        # Last message, once resultat is complete : suite_traitement reads it after this
+        file_progression.put(("termine", None, None))
+
+    # Log is only fed from the Tk thread : messages from the workers are read from the queue
+    def lire_progression():
+        while True:
             try:
-                pages_ret, pages_sans_tableaux = extraire_pdf_vers_excel(pdf_path, dossier_sortie.get())
-                print("DEBUG - Pages sans tableau :", pages_sans_tableaux)
-                resultat.append((pdf_path, pages_ret, pages_sans_tableaux))
-            except Exception as e:
-                log.insert(tk.END, f"❌ Erreur : {nom_fichier} → {e}\n\n")
+                message = file_progression.get_nowait()
+            except queue.Empty:
+                break
+
+            etape, pdf_path, plage = message[:3]
+            if etape == "termine":
+                manager.shutdown()
+                root.after(100, suite_traitement)
+                return
+
+            nom_fichier = os.path.basename(pdf_path)
+            if plage:
+                nom_fichier += f" (pages {plage[0]}-{plage[1]})"
+            if etape == "debut":
+                log.insert(tk.END, f"📄 Traitement : {nom_fichier}\n")
+            elif etape == "erreur":
+                log.insert(tk.END, f"❌ Erreur : {nom_fichier} → {message[3]}\n\n")
             log.see(tk.END)
 
-        root.after(100, suite_traitement)
+        root.after(200, lire_progression)
 
     def suite_traitement():
-        for pdf_path, pages_ret, pages_sans_tableaux in resultat:
+        for pdf_path, pages_ret, pages_sans_tableaux, erreur in resultat:
             nom_fichier = os.path.basename(pdf_path)
+            if erreur is not None and not pages_ret and not pages_sans_tableaux:
+                log.insert(tk.END, f"❌ Non extrait : {nom_fichier}\n\n")
+                continue
+            if erreur is not None:
+                log.insert(tk.END, f"⚠️ {nom_fichier} : extraction partielle (plages en erreur ci-dessus)\n")
 
             # Pages without tables
             if pages_sans_tableaux:
@@ -50,10 +100,16 @@ def lancer_extraction():
                 if messagebox.askyesno("Tableaux image",
                                        f"{nom_fichier} contient des pages sans tableau détecté.\nSouhaitez-vous traiter ces pages comme images ?"):
                     reponse = simpledialog.askstring("Pages à traiter",
-                                                     "Entrez les pages à traiter comme images (ex: 5, 7, 8) :")
+                                                     "Entrez les pages à traiter comme images (ex: 5, 7, 8) :",
+                                                     initialvalue=", ".join(str(p) for p, _ in pages_sans_tableaux))
                     if reponse:
                         page_nums = [int(p.strip()) for p in reponse.split(",") if p.strip().isdigit()]
-                        traiter_tableaux_image(pdf_path, page_nums, dossier_sortie.get())
+                        progression = fenetre_progression("Traitement OCR", f"OCR des pages de {nom_fichier}...")
+                        try:
+                            traiter_tableaux_image(pdf_path, page_nums, dossier_sortie.get(),
+                                                   format_sortie=format_sortie, progression=progression)
+                        finally:
+                            progression.fermer()
 
             # Pages with tables found
             if pages_ret:
@@ -66,7 +122,8 @@ def lancer_extraction():
             log.insert(tk.END, f"✅ Terminé : {nom_fichier}\n\n")
             log.see(tk.END)
 
-    threading.Thread(target=traitement).start()
+    threading.Thread(target=traitement, daemon=True).start()
+    root.after(200, lire_progression)
 
 def choisir_pdfs():
     fichiers = filedialog.askopenfilenames(filetypes=[("Fichiers PDF", "*.pdf")])
@@ -98,17 +155,8 @@ def tester_detection_opencv():
             messagebox.showwarning("Dossier", "Veuillez d’abord choisir un dossier de sortie.")
             return
 
-        detecter_tableaux_par_image(pdf_path, [page_num], dossier)
-
-        # OCR
-        dossier_images = dossier
-        ocr_output_file = os.path.join(dossier, f"{os.path.basename(pdf_path).split('.')[0]}_ocr_tables.xlsx")
-
-        if not any(f.lower().endswith(".png") for f in os.listdir(dossier_images)):
-            messagebox.showwarning("Pas d’images", "Aucune image détectée dans le dossier sélectionné.")
-            return
-
-        tableaux = ocr_sur_images_decoupees(dossier_images, ocr_output_file, zoom_factor=2)
+        # Detection + OCR in memory, cell images only written in debug
+        tableaux = detecter_tableaux_par_image(pdf_path, [page_num], dossier)
 
         if tableaux:
             messagebox.showinfo("Succès", f"{len(tableaux)} tableaux extraits et enregistrés.")
@@ -118,47 +166,69 @@ def tester_detection_opencv():
         messagebox.showerror("Erreur", f"Erreur pendant l'extraction :\n{e}")
 
 
+# Big PDF are split in page ranges of this size to be spread on the workers (None = one task per PDF)
+# Off by default : each range gives its own {pdf}_extraction_pX-Y file, the mapping opens one file at a time
+PAGES_PAR_TACHE = None
+
 
 # =============================================================
 # ------------------------- Interface -------------------------
 # =============================================================
 
-root = tk.Tk()
-root.title("Extracteur de Tableaux PDF → Excel")
-root.geometry("500x700")
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+
+    root = tk.Tk()
+    root.title("Extracteur de Tableaux PDF → Excel")
+    root.geometry("500x740")
+
+    main_frame = tk.Frame(root, padx=10, pady=10)
+    main_frame.pack(fill=tk.BOTH, expand=True)
+    dossier_sortie = tk.StringVar(value="Aucun dossier de sortie sélectionné")
+
 
-main_frame = tk.Frame(root, padx=10, pady=10)
-main_frame.pack(fill=tk.BOTH, expand=True)
-dossier_sortie = tk.StringVar(value="Aucun dossier de sortie sélectionné")
+    tk.Label(main_frame, text="Fichiers PDF sélectionnés :", font=("Segoe UI", 10, "bold")).pack(pady=10)
+    pdf_listbox = tk.Listbox(main_frame, height=5, width=100)
+    pdf_listbox.pack(pady=(0, 10))
+    tk.Button(main_frame, text="Ajouter PDF", command=choisir_pdfs).pack(pady=2)
+    tk.Button(main_frame, text="🗑️ Vider la sélection", command=vider_selection).pack(pady=2)
 
 
-tk.Label(main_frame, text="Fichiers PDF sélectionnés :", font=("Segoe UI", 10, "bold")).pack(pady=10)
-pdf_listbox = tk.Listbox(main_frame, height=5, width=100)
-pdf_listbox.pack(pady=(0, 10))
-tk.Button(main_frame, text="Ajouter PDF", command=choisir_pdfs).pack(pady=2)
-tk.Button(main_frame, text="🗑️ Vider la sélection", command=vider_selection).pack(pady=2)
+    ttk.Separator(main_frame, orient='horizontal').pack(fill='x', padx=5, pady=5)
+    tk.Label(main_frame, text="Traitement : PDF → Excel", font=("Segoe UI", 10, "bold")).pack(pady=5)
+    tk.Button(main_frame, text="📁 Choisir dossier de sortie", command=choisir_dossier).pack(pady=5)
+    tk.Label(main_frame, textvariable=dossier_sortie, fg="blue").pack()
 
+    options_frame = tk.Frame(main_frame)
+    options_frame.pack(pady=5)
+    tk.Label(options_frame, text="Processus parallèles :").pack(side=tk.LEFT)
+    nb_workers = tk.Spinbox(options_frame, from_=1, to=max(1, os.cpu_count() or 1), width=4)
+    nb_workers.delete(0, tk.END)
+    nb_workers.insert(0, str(max(1, os.cpu_count() or 1)))
+    nb_workers.pack(side=tk.LEFT, padx=(2, 10))
+    tk.Label(options_frame, text="Mémoire max / processus (Mo) :").pack(side=tk.LEFT)
+    memoire_worker = tk.Entry(options_frame, width=6)
+    memoire_worker.pack(side=tk.LEFT, padx=2)
+    sortie_parquet = tk.BooleanVar(value=False)
+    tk.Checkbutton(main_frame, text="Sortie Parquet (lue directement par le mapping)",
+                   variable=sortie_parquet).pack()
 
-ttk.Separator(main_frame, orient='horizontal').pack(fill='x', padx=5, pady=5)
-tk.Label(main_frame, text="Traitement : PDF → Excel", font=("Segoe UI", 10, "bold")).pack(pady=5)
-tk.Button(main_frame, text="📁 Choisir dossier de sortie", command=choisir_dossier).pack(pady=5)
-tk.Label(main_frame, textvariable=dossier_sortie, fg="blue").pack()
-tk.Button(main_frame, text="🚀 Lancer l'extraction", command=lancer_extraction, bg="green", fg="white").pack(pady=10)
+    tk.Button(main_frame, text="🚀 Lancer l'extraction", command=lancer_extraction, bg="green", fg="white").pack(pady=10)
 
 
-ttk.Separator(main_frame, orient='horizontal').pack(fill='x', padx=5, pady=5)
-tk.Label(main_frame, text="Traitement : Image → Excel (via OCR)", font=("Segoe UI", 10, "bold")).pack(pady=5)
-tk.Button(main_frame, text="🧩 Tester détection tableau image (OpenCV)", command=tester_detection_opencv).pack(pady=5)
+    ttk.Separator(main_frame, orient='horizontal').pack(fill='x', padx=5, pady=5)
+    tk.Label(main_frame, text="Traitement : Image → Excel (via OCR)", font=("Segoe UI", 10, "bold")).pack(pady=5)
+    tk.Button(main_frame, text="🧩 Tester détection tableau image (OpenCV)", command=tester_detection_opencv).pack(pady=5)
 
 
-ttk.Separator(main_frame, orient='horizontal').pack(fill='x', padx=5, pady=5)
-tk.Label(main_frame, text="Traitement : Excel → Table attributaire", font=("Segoe UI", 10, "bold")).pack(pady=5)
-tk.Button(main_frame, text="⚡ Mapping express vers table attributaire", command=appliquer_mapping_rapide, bg="green", fg="white").pack(pady=5)
+    ttk.Separator(main_frame, orient='horizontal').pack(fill='x', padx=5, pady=5)
+    tk.Label(main_frame, text="Traitement : Excel → Table attributaire", font=("Segoe UI", 10, "bold")).pack(pady=5)
+    tk.Button(main_frame, text="⚡ Mapping express vers table attributaire", command=appliquer_mapping_rapide, bg="green", fg="white").pack(pady=5)
 
 
-# LOG
-tk.Label(main_frame, text="📝 Log :", font=("Segoe UI", 10, "bold")).pack(anchor="w", pady=(20, 0))
-log = scrolledtext.ScrolledText(main_frame, height=15, width=100)
-log.pack()
+    # LOG
+    tk.Label(main_frame, text="📝 Log :", font=("Segoe UI", 10, "bold")).pack(anchor="w", pady=(20, 0))
+    log = scrolledtext.ScrolledText(main_frame, height=15, width=100)
+    log.pack()
 
-root.mainloop()
\ No newline at end of file
+    root.mainloop()
\ No newline at end of file
@@ -3,18 +3,26 @@ from tkinter import filedialog, messagebox, Toplevel, Listbox, MULTIPLE, END
 import pandas as pd
 import os
 
+from table_export import lire_feuilles_parquet, lister_feuilles_parquet
+
 template_path = os.path.join(os.path.dirname(__file__), "template_attributaire.xlsx")
 
 # === Script : FIXED MAPPING TO MERGE DATA FROM PDF EXTRACT ===
 # = v2 : Based on template of mapping from Excel that can be filled by others
+# = v3 : Extraction can be read from the Parquet output, Excel only for the final _nettoyé.xlsx
 #
 def appliquer_mapping_rapide():
-    path_extraction = filedialog.askopenfilename(title="Fichier d'extraction", filetypes=[("Excel", "*.xlsx")])
+    path_extraction = filedialog.askopenfilename(title="Fichier d'extraction",
+                                                 filetypes=[("Extraction", "*.xlsx *.parquet"),
+                                                            ("Excel", "*.xlsx"), ("Parquet", "*.parquet")])
     if not path_extraction:
         return
 
-    xls = pd.ExcelFile(path_extraction, engine="openpyxl")
-    feuilles = xls.sheet_names
+    if path_extraction.lower().endswith(".parquet"):
+        feuilles = lister_feuilles_parquet(path_extraction)
+    else:
+        xls = pd.ExcelFile(path_extraction, engine="openpyxl")
+        feuilles = xls.sheet_names
 
     popup = Toplevel()
     popup.title("Sélection des feuilles")
@@ -52,9 +60,15 @@ def traiter_concat_filtrage(path_extraction, feuilles_insitu, feuilles_labo):
 
 
     def charger_feuilles(path, feuilles):
+        # Parquet : every sheet read at once, same DataFrames as read_excel
+        if path.lower().endswith(".parquet"):
+            tables = lire_feuilles_parquet(path, feuilles)
+        else:
+            tables = {feuille: pd.read_excel(path, sheet_name=feuille, engine="openpyxl") for feuille in feuilles}
+
         frames = []
         for feuille in feuilles:
-            df = pd.read_excel(path, sheet_name=feuille, engine="openpyxl")
+            df = tables[feuille]
             df = df.iloc[1:]  # Ignorer la première ligne (en-têtes)
             df.columns = [f"col_{i}" for i in range(len(df.columns))]
             frames.append(df)
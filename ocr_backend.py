@@ -0,0 +1,220 @@
+import os
+import sys
+import time
+import shlex
+import argparse
+import threading
+
+import numpy as np
+import pytesseract
+from PIL import Image
+
+
+# === Script : OCR BACKENDS ===
+# = "pytesseract" : one tesseract.exe process per call (temp image file + traineddata loaded every time)
+# = "tesserocr"   : Tesseract API kept in memory, language model loaded once per worker thread,
+#                   NumPy buffers given directly (needs : pip install tesserocr)
+# = Both return the same results :
+#       texte(image, lang, config)   -> str (as pytesseract.image_to_string)
+#       donnees(image, lang, config) -> dict of lists (as pytesseract.image_to_data, Output.DICT)
+# = Selection : obtenir_backend("tesserocr") or EXTRACTPDF_OCR_BACKEND=pytesseract|tesserocr|auto
+# = preparer : optional image -> image function (zoom, preprocessing) applied just before the OCR,
+#   parametres : its settings, only used by the OCR cache (ocr_cache) to build the key
+# = Benchmark : python ocr_backend.py bench TABLE_1.png --repetitions 20
+#
+BACKEND_OCR = os.environ.get("EXTRACTPDF_OCR_BACKEND", "auto")
+
+
+def _options_config(config):
+    # "--psm 6 -c preserve_interword_spaces=1" -> (6, {"preserve_interword_spaces": "1"})
+    psm, variables = None, {}
+    morceaux = shlex.split(config or "")
+    i = 0
+    while i < len(morceaux):
+        if morceaux[i] == "--psm" and i + 1 < len(morceaux):
+            psm = int(morceaux[i + 1])
+            i += 1
+        elif morceaux[i] == "-c" and i + 1 < len(morceaux) and "=" in morceaux[i + 1]:
+            cle, valeur = morceaux[i + 1].split("=", 1)
+            variables[cle] = valeur
+            i += 1
+        i += 1
+    return psm, variables
+
+
+class BackendPytesseract:
+    nom = "pytesseract"
+
+    def texte(self, image, lang="fra", config="", preparer=None, parametres=None):
+        image = preparer(image) if preparer else image
+        return pytesseract.image_to_string(image, lang=lang, config=config)
+
+    def donnees(self, image, lang="fra", config="", preparer=None, parametres=None):
+        image = preparer(image) if preparer else image
+        return pytesseract.image_to_data(image, lang=lang, config=config, output_type=pytesseract.Output.DICT)
+
+
+class BackendTesserocr:
+    nom = "tesserocr"
+
+    def __init__(self, tessdata=None):
+        import tesserocr
+        self._tesserocr = tesserocr
+        self.tessdata = tessdata or os.environ.get("TESSDATA_PREFIX") or self._tessdata_installe()
+        self._local = threading.local()
+
+    @staticmethod
+    def _tessdata_installe():
+        dossier = os.path.join(os.path.dirname(pytesseract.pytesseract.tesseract_cmd), "tessdata")
+        return dossier if os.path.isdir(dossier) else None
+
+    def _api(self, lang):
+        # One API per thread and language : the traineddata is loaded once
+        apis = self._local.__dict__.setdefault("apis", {})
+        if lang not in apis:
+            options = {"lang": lang}
+            if self.tessdata:
+                options["path"] = self.tessdata
+            apis[lang] = self._tesserocr.PyTessBaseAPI(**options)
+        return apis[lang]
+
+    def _preparer(self, image, lang, config):
+        api = self._api(lang)
+        api.Clear()
+        psm, variables = _options_config(config)
+        api.SetPageSegMode(psm if psm is not None else self._tesserocr.PSM.AUTO)
+
+        # Variables set by a previous call (-c ...) are put back to their default value
+        defauts = self._local.__dict__.setdefault("defauts", {}).setdefault(lang, {})
+        for cle in list(defauts):
+            if cle not in variables:
+                api.SetVariable(cle, defauts.pop(cle))
+        for cle, valeur in variables.items():
+            if cle not in defauts:
+                defauts[cle] = api.GetVariableAsString(cle) or ""
+            api.SetVariable(cle, valeur)
+
+        if isinstance(image, Image.Image):
+            api.SetImage(image)
+        else:
+            image = np.ascontiguousarray(image, dtype=np.uint8)
+            hauteur, largeur = image.shape[:2]
+            canaux = 1 if image.ndim == 2 else image.shape[2]
+            api.SetImageBytes(image.tobytes(), largeur, hauteur, canaux, largeur * canaux)
+        return api
+
+    def texte(self, image, lang="fra", config="", preparer=None, parametres=None):
+        image = preparer(image) if preparer else image
+        return self._preparer(image, lang, config).GetUTF8Text()
+
+    def donnees(self, image, lang="fra", config="", preparer=None, parametres=None):
+        tesserocr = self._tesserocr
+        image = preparer(image) if preparer else image
+        api = self._preparer(image, lang, config)
+        api.Recognize()
+
+        data = {k: [] for k in ("level", "block_num", "par_num", "line_num", "word_num",
+                                "left", "top", "width", "height", "conf", "text")}
+        iterateur = api.GetIterator()
+        if iterateur is None:
+            return data
+
+        bloc = par = ligne = mot = 0
+        niveau = tesserocr.RIL.WORD
+        while True:
+            if iterateur.IsAtBeginningOf(tesserocr.RIL.BLOCK):
+                bloc, par, ligne = bloc + 1, 0, 0
+            if iterateur.IsAtBeginningOf(tesserocr.RIL.PARA):
+                par, ligne = par + 1, 0
+            if iterateur.IsAtBeginningOf(tesserocr.RIL.TEXTLINE):
+                ligne, mot = ligne + 1, 0
+            mot += 1
+
+            boite = iterateur.BoundingBox(niveau)
+            texte = iterateur.GetUTF8Text(niveau)
+            if boite is not None and texte is not None:
+                x0, y0, x1, y1 = boite
+                data["level"].append(5)
+                data["block_num"].append(bloc)
+                data["par_num"].append(par)
+                data["line_num"].append(ligne)
+                data["word_num"].append(mot)
+                data["left"].append(x0)
+                data["top"].append(y0)
+                data["width"].append(x1 - x0)
+                data["height"].append(y1 - y0)
+                data["conf"].append(iterateur.Confidence(niveau))
+                data["text"].append(texte)
+
+            if not iterateur.Next(niveau):
+                break
+        return data
+
+
+BACKENDS = {
+    "pytesseract": BackendPytesseract,
+    "tesserocr": BackendTesserocr,
+}
+
+_backends = {}
+
+
+def obtenir_backend(nom=None, cache=None):
+    # "auto" : persistent engine if tesserocr is installed, pytesseract otherwise
+    # cache : results kept in the OCR cache (default : EXTRACTPDF_OCR_CACHE, on)
+    nom = nom or BACKEND_OCR
+    if nom == "auto":
+        try:
+            return obtenir_backend("tesserocr", cache=cache)
+        except ImportError:
+            return obtenir_backend("pytesseract", cache=cache)
+
+    if nom not in BACKENDS:
+        raise ValueError(f"Backend OCR inconnu : {nom} (choix : {', '.join(BACKENDS)}, auto)")
+
+    from ocr_cache import CACHE_OCR_ACTIF, BackendCache
+    cache = CACHE_OCR_ACTIF if cache is None else cache
+    if (nom, cache) not in _backends:
+        backend = _backends.get((nom, False)) or BACKENDS[nom]()
+        _backends[(nom, False)] = backend
+        if cache:
+            _backends[(nom, True)] = BackendCache(backend)
+    return _backends[(nom, cache)]
+
+
+# === Benchmark : subprocess (pytesseract) vs persistent engine (tesserocr) ===
+def benchmark(image_path, repetitions=10, lang="fra", config="--psm 6"):
+    image = np.array(Image.open(image_path).convert("L"))
+    resultats = {}
+    for nom in BACKENDS:
+        try:
+            backend = obtenir_backend(nom, cache=False)
+        except ImportError:
+            print(f"⚠️ {nom} non installé, ignoré")
+            continue
+
+        backend.texte(image, lang=lang, config=config)  # warm-up : model loading not counted for tesserocr
+        debut = time.perf_counter()
+        for _ in range(repetitions):
+            backend.texte(image, lang=lang, config=config)
+        resultats[nom] = (time.perf_counter() - debut) / repetitions
+        print(f"⏱ {nom:<12} : {resultats[nom] * 1000:.1f} ms / appel")
+    return resultats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backends OCR")
+    sub = parser.add_subparsers(dest="action", required=True)
+    bench = sub.add_parser("bench", help="Compare pytesseract et tesserocr sur une image")
+    bench.add_argument("image")
+    bench.add_argument("--repetitions", type=int, default=10)
+    bench.add_argument("--lang", default="fra")
+    bench.add_argument("--config", default="--psm 6")
+    args = parser.parse_args(argv)
+
+    if args.action == "bench":
+        benchmark(args.image, repetitions=args.repetitions, lang=args.lang, config=args.config)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
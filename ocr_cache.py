@@ -0,0 +1,62 @@
+import os
+import hashlib
+
+import numpy as np
+from PIL import Image
+
+from disk_cache import CacheDisque
+
+
+# === Script : OCR RESULT CACHE ===
+# = Key : hash of the pixels (before zoom / preprocessing) + engine + language + Tesseract config + parameters
+#   of the preprocessing (zoom factor...) -> a re-run on the same images does not call Tesseract at all
+# = Stored : the text for texte(), the words with their boxes and confidences for donnees()
+# = LRU size limit from disk_cache (namespace "ocr") ; disabled with EXTRACTPDF_OCR_CACHE=0
+# = No lock : the entries are written atomically by disk_cache, the OCR threads read / write in parallel
+#
+CACHE_OCR_ACTIF = os.environ.get("EXTRACTPDF_OCR_CACHE", "1") != "0"
+TAILLE_MAX_CACHE_OCR_MO = 200
+
+
+def empreinte_image(image):
+    h = hashlib.blake2b(digest_size=20)
+    if isinstance(image, Image.Image):
+        h.update(f"{image.mode}{image.size}".encode())
+        h.update(image.tobytes())
+    else:
+        image = np.ascontiguousarray(image)
+        h.update(f"{image.dtype}{image.shape}".encode())
+        h.update(image.data)
+    return h.hexdigest()
+
+
+class BackendCache:
+    # Same interface as the backends of ocr_backend, results read from the cache when possible
+    def __init__(self, backend, taille_max_mo=TAILLE_MAX_CACHE_OCR_MO):
+        self.backend = backend
+        self.nom = backend.nom
+        self.cache = CacheDisque("ocr", taille_max_mo=taille_max_mo)
+
+    def _cle(self, type_resultat, image, lang, config, parametres):
+        return self.cache.cle(type_resultat, self.backend.nom, empreinte_image(image), lang, config, parametres or {})
+
+    def texte(self, image, lang="fra", config="", preparer=None, parametres=None):
+        cle = self._cle("texte", image, lang, config, parametres)
+        entree = self.cache.get(cle)
+        if entree is not None:
+            return entree["texte"]
+
+        texte = self.backend.texte(image, lang=lang, config=config, preparer=preparer)
+        self.cache.set(cle, {"texte": texte})
+        return texte
+
+    def donnees(self, image, lang="fra", config="", preparer=None, parametres=None):
+        cle = self._cle("donnees", image, lang, config, parametres)
+        entree = self.cache.get(cle)
+        if entree is not None:
+            return entree
+
+        data = self.backend.donnees(image, lang=lang, config=config, preparer=preparer)
+        data = {k: [v.item() if hasattr(v, "item") else v for v in valeurs] for k, valeurs in data.items()}
+        self.cache.set(cle, data)
+        return data
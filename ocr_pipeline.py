@@ -0,0 +1,105 @@
+import queue
+import threading
+
+
+# === Script : STAGED PIPELINE WITH BOUNDED QUEUES ===
+# = source (iterated in its own thread, e.g. PyMuPDF rendering) -> stage 1 -> stage 2 ... -> caller
+#   Each stage has its own threads (OpenCV and Tesseract release the GIL : the stages really overlap)
+# = Queues of TAILLE_FILE elements : a fast stage waits for the next one (back-pressure),
+#   the number of pages in memory stays bounded whatever the length of the PDF
+# = Results given back in the order of the source, with the error of the element if a stage failed
+#
+TAILLE_FILE = 2
+_FIN = object()
+
+
+def _mettre(file, element, arret):
+    # put that gives up if the pipeline was stopped (consumer gone)
+    while not arret.is_set():
+        try:
+            file.put(element, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _prendre(file, arret):
+    while not arret.is_set():
+        try:
+            return file.get(timeout=0.1)
+        except queue.Empty:
+            pass
+    return _FIN
+
+
+def executer_pipeline(source, etapes, taille_file=TAILLE_FILE):
+    """
+    Enchaîne les étapes [(fonction, nb_threads)] sur les éléments de source.
+    Générateur de (résultat, erreur) dans l'ordre de source : erreur = exception levée par la source
+    ou une étape pour cet élément (résultat None), les étapes suivantes ne sont pas appelées.
+    """
+    files = [queue.Queue(maxsize=taille_file) for _ in range(len(etapes) + 1)]
+    nb_threads = [nb for _, nb in etapes] + [1]  # last queue : read by the caller
+    arret = threading.Event()
+
+    def alimenter():
+        i = 0
+        try:
+            for element in source:
+                if not _mettre(files[0], (i, element, None), arret):
+                    return
+                i += 1
+        except Exception as e:
+            _mettre(files[0], (i, None, e), arret)
+        for _ in range(nb_threads[0]):
+            _mettre(files[0], _FIN, arret)
+
+    def travailler(n_etape, fonction, restants, verrou):
+        entree, sortie = files[n_etape], files[n_etape + 1]
+        while True:
+            element = _prendre(entree, arret)
+            if element is _FIN:
+                break
+            i, valeur, erreur = element
+            if erreur is None:
+                try:
+                    valeur = fonction(valeur)
+                except Exception as e:
+                    valeur, erreur = None, e
+            if not _mettre(sortie, (i, valeur, erreur), arret):
+                return
+
+        # Last thread of the stage : end of the stream for the next stage
+        with verrou:
+            restants[0] -= 1
+            dernier = restants[0] == 0
+        if dernier:
+            for _ in range(nb_threads[n_etape + 1]):
+                _mettre(sortie, _FIN, arret)
+
+    threads = [threading.Thread(target=alimenter, name="pipeline-source", daemon=True)]
+    for n_etape, (fonction, nb) in enumerate(etapes):
+        restants, verrou = [nb], threading.Lock()
+        threads += [threading.Thread(target=travailler, args=(n_etape, fonction, restants, verrou),
+                                     name=f"pipeline-{n_etape + 1}", daemon=True) for _ in range(nb)]
+    for t in threads:
+        t.start()
+
+    # Results put back in order : out of order ones wait here (bounded by the queues in front)
+    en_attente = {}
+    prochain = 0
+    try:
+        while True:
+            element = _prendre(files[-1], arret)
+            if element is _FIN:
+                break
+            i, valeur, erreur = element
+            en_attente[i] = (valeur, erreur)
+            while prochain in en_attente:
+                yield en_attente.pop(prochain)
+                prochain += 1
+    finally:
+        arret.set()
+        for t in threads:
+            t.join()
@@ -0,0 +1,69 @@
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+# === Script : SHARED OCR WORKER POOL ===
+# = Tesseract runs outside of the GIL (sub-process / C library) -> a thread pool is enough to use every core
+# = OMP_THREAD_LIMIT=1 for the Tesseract processes : N workers x N OpenMP threads would oversubscribe the CPU
+# = Results keep the order of the inputs, progress is given to a callback progression(done, total)
+#   called from the calling thread (safe to update a Tk widget from it)
+#
+def nb_workers_defaut():
+    return max(1, os.cpu_count() or 1)
+
+
+class ExecuteurOCR:
+    def __init__(self, max_workers=None, threads_par_worker=1):
+        self.max_workers = max_workers or nb_workers_defaut()
+        if self.max_workers > 1 and "OMP_THREAD_LIMIT" not in os.environ:
+            os.environ["OMP_THREAD_LIMIT"] = str(threads_par_worker)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ocr")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.fermer()
+        return False
+
+    def map(self, fonction, elements, progression=None, total=None):
+        """
+        Applique fonction à chaque élément sur les workers, résultats dans l'ordre des éléments.
+        elements peut être un générateur : au plus 2 x max_workers éléments sont chargés en même temps.
+        """
+        if total is None and hasattr(elements, "__len__"):
+            total = len(elements)
+
+        resultats = []
+        en_cours = deque()
+        faits = 0
+
+        def attendre_premier():
+            nonlocal faits
+            resultats.append(en_cours.popleft().result())
+            faits += 1
+            if progression is not None:
+                progression(faits, total)
+
+        for element in elements:
+            en_cours.append(self._pool.submit(fonction, element))
+            if len(en_cours) >= 2 * self.max_workers:
+                attendre_premier()
+        while en_cours:
+            attendre_premier()
+        return resultats
+
+    def fermer(self):
+        self._pool.shutdown(wait=True)
+
+
+_executeur_partage = None
+
+
+def executeur_partage():
+    # One pool for the whole application
+    global _executeur_partage
+    if _executeur_partage is None:
+        _executeur_partage = ExecuteurOCR()
+    return _executeur_partage
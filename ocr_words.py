@@ -0,0 +1,222 @@
+import re
+
+import numpy as np
+
+from ocr_backend import obtenir_backend
+
+
+# === Script : WORD-LEVEL OCR AND WORD -> CELL ASSIGNMENT ===
+# = One image_to_data pass on a page (or a table region) instead of one Tesseract call per cell :
+#   each word box is given to the smallest cell containing its center
+# = Confidence cascade : native resolution first, zoom / binarization only for the low-confidence images
+#
+SEUIL_CONFIANCE = 60      # under this confidence (0-100) a cell is OCR'd again on its own
+CONFIG_PAGE = "--psm 11"  # sparse text : table cells are not one text block
+CONFIG_LIGNE = "--psm 6"  # row strip : one uniform block of text
+
+# = Numeric columns : once the first cells of a column (header excepted) all read as numbers,
+#   the other cells of the column are read with a digit whitelist (--psm 7 for one cell,
+#   --psm 6 for a column strip) and their value parsed to float ("12,5" -> 12.5)
+NB_ECHANTILLON_NUMERIQUE = 3
+CARACTERES_NUMERIQUES = "0123456789.,-+<>"
+RE_NOMBRE = re.compile(r"[<>]?[+-]?\d+(?:[.,]\d+)?")
+
+
+def ocr_mots(image, lang="fra", config=CONFIG_PAGE, decalage=(0, 0), zoom=1, preparer=None, parametres=None):
+    # Words of the image with their box in the coordinates of the page (decalage = origin of the crop)
+    # zoom : scale applied by preparer, word boxes are put back to the scale of the image
+    data = obtenir_backend().donnees(image, lang=lang, config=config, preparer=preparer, parametres=parametres)
+    dx, dy = decalage
+
+    mots = []
+    for i, texte in enumerate(data["text"]):
+        texte = str(texte).strip()
+        conf = float(data["conf"][i])
+        if not texte or conf < 0:
+            continue
+        mots.append({
+            "text": texte,
+            "x": data["left"][i] / zoom + dx,
+            "y": data["top"][i] / zoom + dy,
+            "w": data["width"][i] / zoom,
+            "h": data["height"][i] / zoom,
+            "conf": conf,
+            "ligne": (data["block_num"][i], data["par_num"][i], data["line_num"][i]),
+        })
+    return mots
+
+
+def bandes_lignes(cellules):
+    # {grid row: [cell index]} of the cells on one row only (cells spanning several rows are OCR'd alone)
+    # Blank cells are left out (erased from the strip), a row of blank cells gives no strip
+    bandes = {}
+    for i_box, cellule in enumerate(cellules):
+        if cellule.get("nb_lignes", 1) == 1 and not cellule.get("vide"):
+            bandes.setdefault(cellule["ligne"], []).append(i_box)
+    return bandes
+
+
+def ocr_bande(image, cellules, indices, lang="fra", config=CONFIG_LIGNE, zoom=1, preparer=None, parametres=None):
+    """
+    Une seule passe OCR sur la bande couvrant les cellules données (une ligne ou une colonne de la grille).
+    Tout ce qui est hors des cellules (traits, cellules vides) est effacé,
+    les mots sont rendus à leur cellule : {indice: [mots]}.
+    """
+    boxes = [cellules[i]["box"] for i in indices]
+    x0 = min(b[0] for b in boxes)
+    y0 = min(b[1] for b in boxes)
+    x1 = max(b[0] + b[2] for b in boxes)
+    y1 = max(b[1] + b[3] for b in boxes)
+
+    bande = np.full_like(image[y0:y1, x0:x1], 255)
+    for x, y, w, h in boxes:
+        bande[y - y0:y - y0 + h, x - x0:x - x0 + w] = image[y:y + h, x:x + w]
+
+    mots = ocr_mots(bande, lang=lang, config=config, decalage=(x0, y0), zoom=zoom,
+                    preparer=preparer, parametres=parametres)
+    return {indices[k]: m for k, m in assigner_mots_cellules(mots, boxes).items()}
+
+
+def ocr_grille_bandes(image, cellules, lang="fra", config=CONFIG_LIGNE, zoom=1, preparer=None, parametres=None,
+                      typage=True, mapper=map):
+    """
+    OCR de la grille par bandes : les premières lignes en entier (échantillon), puis si typage,
+    les colonnes numériques en une bande par colonne avec la liste blanche de chiffres,
+    le reste en bandes de lignes. Les textes sont écrits dans les cellules couvertes.
+    mapper(fonction, bandes) : map ou executeur_partage().map.
+    Retourne ({indice: [mots]}, indices couverts, colonnes numériques).
+    """
+    options = dict(lang=lang, zoom=zoom, preparer=preparer, parametres=parametres)
+    bandes = bandes_lignes(cellules)
+    lignes = sorted(bandes)
+    nb_premieres = NB_ECHANTILLON_NUMERIQUE + 1 if typage else len(lignes)
+
+    def lire(travaux):
+        mots_par_cellule = {}
+        for mots_bande in mapper(lambda t: ocr_bande(image, cellules, t[0], config=t[1], **options), travaux):
+            mots_par_cellule.update(mots_bande)
+        for i in (i for indices, _ in travaux for i in indices):
+            cellules[i]["texte"] = texte_des_mots(mots_par_cellule.get(i, []))
+        return mots_par_cellule
+
+    mots_par_cellule = lire([(bandes[l], config) for l in lignes[:nb_premieres]])
+    numeriques = colonnes_numeriques(cellules) if typage else set()
+
+    travaux = []
+    colonnes = {}
+    for l in lignes[nb_premieres:]:
+        texte = [i for i in bandes[l] if cellules[i]["colonne"] not in numeriques or cellules[i].get("nb_colonnes", 1) > 1]
+        if texte:
+            travaux.append((texte, config))
+        for i in bandes[l]:
+            if i not in texte:
+                colonnes.setdefault(cellules[i]["colonne"], []).append(i)
+    travaux += [(indices, config_numerique(psm=6)) for _, indices in sorted(colonnes.items())]
+    mots_par_cellule.update(lire(travaux))
+
+    couvertes = {i for indices in bandes.values() for i in indices}
+    return mots_par_cellule, couvertes, numeriques
+
+
+def assigner_mots_cellules(mots, boxes):
+    # {box index: [mots]} -> smallest box (x, y, w, h) containing the center of the word
+    cellules = {}
+    if not mots or not boxes:
+        return cellules
+
+    centres_x = np.array([m["x"] + m["w"] / 2 for m in mots])[:, None]
+    centres_y = np.array([m["y"] + m["h"] / 2 for m in mots])[:, None]
+    b = np.asarray(boxes, dtype=float)
+    x0, y0, x1, y1 = b[:, 0], b[:, 1], b[:, 0] + b[:, 2], b[:, 1] + b[:, 3]
+
+    dedans = (centres_x >= x0) & (centres_x < x1) & (centres_y >= y0) & (centres_y < y1)
+    aires = np.where(dedans, (b[:, 2] * b[:, 3])[None, :], np.inf)
+    meilleure = aires.argmin(axis=1)
+    trouve = dedans.any(axis=1)
+
+    for i_mot in np.flatnonzero(trouve):
+        cellules.setdefault(int(meilleure[i_mot]), []).append(mots[i_mot])
+    return cellules
+
+
+def texte_des_mots(mots, espacer_colonnes=False):
+    # Words of a cell put back in reading order : one line per Tesseract line
+    # espacer_colonnes : 2 spaces where the gap between two words is wider than the text height
+    #                    (as image_to_string, for texte_vers_tableau)
+    lignes = {}
+    for m in mots:
+        lignes.setdefault(m["ligne"], []).append(m)
+    lignes = sorted(lignes.values(), key=lambda ms: min(m["y"] for m in ms))
+
+    textes = []
+    for ms in lignes:
+        ms = sorted(ms, key=lambda m: m["x"])
+        texte = ms[0]["text"]
+        hauteur = float(np.median([m["h"] for m in ms]))
+        for precedent, m in zip(ms, ms[1:]):
+            ecart = m["x"] - (precedent["x"] + precedent["w"])
+            texte += ("  " if espacer_colonnes and ecart > hauteur else " ") + m["text"]
+        textes.append(texte)
+    return "\n".join(textes)
+
+
+def confiance_min(mots):
+    return min((m["conf"] for m in mots), default=0.0)
+
+
+def ocr_cascade(image, etapes, lang="fra", config="", seuil=SEUIL_CONFIANCE):
+    """
+    OCR en cascade : d'abord à la résolution native, puis chaque étape (preparer, parametres, zoom)
+    seulement tant que la confiance minimale des mots reste sous le seuil.
+    Retourne (mots du meilleur passage, numéro de ce passage : 0 = natif).
+    """
+    meilleurs, meilleure_confiance, retenue = [], -1.0, 0
+    for n, (preparer, parametres, zoom) in enumerate([(None, None, 1)] + list(etapes)):
+        mots = ocr_mots(image, lang=lang, config=config, zoom=zoom, preparer=preparer, parametres=parametres)
+        confiance = confiance_min(mots)
+        if confiance > meilleure_confiance:
+            meilleurs, meilleure_confiance, retenue = mots, confiance, n
+        if confiance >= seuil:
+            break
+    return meilleurs, retenue
+
+
+def config_numerique(psm=7):
+    # psm 7 : the cell is a single text line
+    return f"--psm {psm} -c tessedit_char_whitelist={CARACTERES_NUMERIQUES}"
+
+
+def est_numerique(texte):
+    return bool(RE_NOMBRE.fullmatch(re.sub(r"\s+", "", texte or "")))
+
+
+def vers_nombre(texte):
+    # "12,5" -> 12.5 ; detection limits ("<0,5") and other text kept as text
+    t = re.sub(r"\s+", "", texte or "")
+    if re.fullmatch(r"[+-]?\d+(?:[.,]\d+)?", t):
+        return float(t.replace(",", "."))
+    return texte
+
+
+def colonnes_numeriques(cellules, nb_echantillon=NB_ECHANTILLON_NUMERIQUE):
+    # Columns whose first nb_echantillon + 1 read cells have at most one non-number (the header)
+    echantillons = {}
+    for c in sorted(cellules, key=lambda c: c["ligne"]):
+        if c.get("nb_colonnes", 1) > 1 or not c.get("texte", "").strip():
+            continue
+        echantillons.setdefault(c["colonne"], []).append(c["texte"])
+
+    numeriques = set()
+    for colonne, textes in echantillons.items():
+        textes = textes[:nb_echantillon + 1]
+        if sum(est_numerique(t) for t in textes) >= nb_echantillon:
+            numeriques.add(colonne)
+    return numeriques
+
+
+def typer_cellules(cellules, numeriques):
+    # Values of the numeric columns parsed to float, the other cells keep their text
+    for c in cellules:
+        texte = c.get("texte", "")
+        c["valeur"] = vers_nombre(texte) if c["colonne"] in numeriques and c.get("nb_colonnes", 1) == 1 else texte
+    return cellules
@@ -0,0 +1,123 @@
+import fitz  # PyMuPDF
+
+
+# === Script : PAGE TYPE PRE-CLASSIFIER (BEFORE CAMELOT) ===
+# = Uses only PyMuPDF text / image / drawing metadata, no rendering :
+#       "vectoriel" -> text layer + ruling lines   -> Camelot lattice
+#                      (lines inside the ruled area : a frame around the page alone is not a table,
+#                      short borders of cell rectangles joined into lines first)
+#       "texte"     -> text layer without rulings  -> Camelot stream
+#       "scan"      -> (almost) no text, big image -> OCR (image_table_extract)
+#
+PAGE_VECTORIELLE = "vectoriel"
+PAGE_TEXTE = "texte"
+PAGE_SCAN = "scan"
+
+# Thresholds
+MIN_MOTS_TEXTE = 20         # under this number of words the page has no usable text layer
+MIN_COUVERTURE_IMAGE = 0.5  # part of the page covered by images for a scan
+MIN_LIGNES_H = 1            # horizontal rulings strictly inside the ruled area needed for a lattice table
+MIN_LIGNES_V = 1            # vertical rulings strictly inside the ruled area needed for a lattice table
+MIN_LIGNES_H_SEULES = 2     # ... or this number of interior horizontal rulings alone (one rectangle per row)
+LONGUEUR_MIN_LIGNE = 20     # pts, after joining the collinear segments
+EPAISSEUR_MAX_LIGNE = 3     # pts, thin rectangles are drawn rulings too
+
+
+def joindre_segments(segments):
+    # Collinear segments (same position to EPAISSEUR_MAX_LIGNE) touching each other joined into one line :
+    # the 15 pt borders of stacked cell rectangles make one long vertical ruling
+    par_position = {}
+    for position, debut, fin in segments:
+        par_position.setdefault(round(position / EPAISSEUR_MAX_LIGNE), []).append((debut, fin, position))
+
+    lignes = []
+    for morceaux in par_position.values():
+        morceaux.sort()
+        debut, fin, position = morceaux[0]
+        for d, f, _ in morceaux[1:]:
+            if d <= fin + EPAISSEUR_MAX_LIGNE:
+                fin = max(fin, f)
+            else:
+                lignes.append((position, debut, fin))
+                debut, fin = d, f
+        lignes.append((position, debut, fin))
+    return [l for l in lignes if l[2] - l[1] >= LONGUEUR_MIN_LIGNE]
+
+
+def segments_lignes(page):
+    # Rulings of the page : horizontal [(y, x0, x1)], vertical [(x, y0, y1)], rectangle borders included
+    horizontales, verticales = [], []
+    for dessin in page.get_drawings():
+        for item in dessin["items"]:
+            if item[0] == "l":
+                p1, p2 = item[1], item[2]
+                x0, x1 = sorted((p1.x, p2.x))
+                y0, y1 = sorted((p1.y, p2.y))
+            elif item[0] == "re":
+                r = item[1]
+                x0, y0, x1, y1 = r.x0, r.y0, r.x1, r.y1
+                if min(r.width, r.height) > EPAISSEUR_MAX_LIGNE:
+                    # Cell / row / frame rectangle, whatever its size : its 2 horizontal + 2 vertical borders
+                    horizontales += [(y0, x0, x1), (y1, x0, x1)]
+                    verticales += [(x0, y0, y1), (x1, y0, y1)]
+                    continue
+            else:
+                continue
+
+            dx, dy = x1 - x0, y1 - y0
+            if dy <= EPAISSEUR_MAX_LIGNE and dx > dy:
+                horizontales.append(((y0 + y1) / 2, x0, x1))
+            elif dx <= EPAISSEUR_MAX_LIGNE and dy > dx:
+                verticales.append(((x0 + x1) / 2, y0, y1))
+    return joindre_segments(horizontales), joindre_segments(verticales)
+
+
+def compter_lignes(page):
+    """
+    Nombre de positions distinctes de lignes horizontales / verticales strictement à l'intérieur
+    du rectangle englobant toutes les lignes : un simple cadre de page ne compte pas comme tableau.
+    """
+    horizontales, verticales = segments_lignes(page)
+    if not horizontales or not verticales:
+        return 0, 0
+
+    x_min = min(min(x for x, _, _ in verticales), min(x0 for _, x0, _ in horizontales))
+    x_max = max(max(x for x, _, _ in verticales), max(x1 for _, _, x1 in horizontales))
+    y_min = min(min(y for y, _, _ in horizontales), min(y0 for _, y0, _ in verticales))
+    y_max = max(max(y for y, _, _ in horizontales), max(y1 for _, _, y1 in verticales))
+
+    # Positions rounded to the ruling thickness : shared borders of adjacent cells counted once
+    interieures_h = {round(y / EPAISSEUR_MAX_LIGNE) for y, _, _ in horizontales
+                     if y_min + EPAISSEUR_MAX_LIGNE < y < y_max - EPAISSEUR_MAX_LIGNE}
+    interieures_v = {round(x / EPAISSEUR_MAX_LIGNE) for x, _, _ in verticales
+                     if x_min + EPAISSEUR_MAX_LIGNE < x < x_max - EPAISSEUR_MAX_LIGNE}
+    return len(interieures_h), len(interieures_v)
+
+
+def couverture_images(page):
+    aire_page = abs(page.rect) or 1
+    aire_images = 0
+    for info in page.get_image_info():
+        bbox = fitz.Rect(info["bbox"]) & page.rect
+        aire_images += abs(bbox)
+    return min(aire_images / aire_page, 1.0)
+
+
+def classer_type_page(page):
+    nb_mots = len(page.get_text("words"))
+    if nb_mots < MIN_MOTS_TEXTE and couverture_images(page) >= MIN_COUVERTURE_IMAGE:
+        return PAGE_SCAN
+
+    nb_h, nb_v = compter_lignes(page)
+    if (nb_h >= MIN_LIGNES_H and nb_v >= MIN_LIGNES_V) or nb_h >= MIN_LIGNES_H_SEULES:
+        return PAGE_VECTORIELLE
+    return PAGE_TEXTE
+
+
+def classer_types_pages(pdf_path, pages):
+    # pages : page numbers (1-indexed, str or int) -> {page: type}
+    types = {}
+    with fitz.open(pdf_path) as doc:
+        for page in pages:
+            types[page] = classer_type_page(doc.load_page(int(page) - 1))
+    return types
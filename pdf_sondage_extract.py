@@ -1,15 +1,20 @@
-import pdfplumber
+import os
+import sys
+import json
+import argparse
 import logging
-import matplotlib.pyplot as plt
-from matplotlib.patches import Rectangle
 import tkinter as tk
 from tkinter import Tk, filedialog, messagebox, ttk
 import re
 
-import statistics
 from decimal import Decimal, getcontext
+
+import numpy as np
 getcontext().prec = 10
 
+from word_index import IndexMots
+from word_source import ouvrir_source_mots
+
 logging.getLogger("pdfminer").setLevel(logging.ERROR)
 
 # === Script : EXTRACT VALUE UNDER KEYWORD IN A TABLE-LIKE FORMAT - ESSAIS PRESSIOMETRIQUES ===
@@ -22,72 +27,110 @@ logging.getLogger("pdfminer").setLevel(logging.ERROR)
 # = v6.5 : Add log on UI and asking user for the keywords
 # = v7 : Exporting the data in Excel EM|Pl for each borehole after last validate on the verif UI + log on UI
 # = v7.5 : Re-opening data after validated lists is possible
+# = v8 : Words of a page indexed once (word_index.IndexMots) : keyword / column queries are NumPy masks
+# = v8.5 : Words read with PyMuPDF by default (word_source), pdfplumber kept as fallback (source_mots="pdfplumber")
+# = v8.6 : Y anomalies of all the columns of a page in one NumPy pass (analyser_ecarts_y)
+# = v9 : Headless engine (extract_all) : depths from a JSON file or the detected depth columns, results saved
+#        in JSON and validated later in the UI (python pdf_sondage_extract.py extract / validate)
+# = v9.5 : Pages extracted separately (extract_pages) and merged by sondage : many PDF in parallel (sondage_batch)
+#          RedFlags of the following pages shifted by the values already merged
 #
 
-def detect_y_anomalies(y_val_list, keyword):
-    if len(y_val_list) < 3:
-        return [v for _, v in y_val_list], []
-
-    y_val_list = sorted(y_val_list, key=lambda x: x[0])
-    y_positions = [y for y, _ in y_val_list]
-    dy_list = [y2 - y1 for y1, y2 in zip(y_positions, y_positions[1:])]
-
-    median_dy = statistics.median(dy_list)
-    min_dy = 0.7 * median_dy
-    max_dy = 1.3 * median_dy
-
-    print(f"\n📏 Médiane des écarts Y pour '{keyword}': {median_dy:.2f} pts")
-    print(f"🔍 Seuils → trop petit: < {min_dy:.2f} pts | trop grand: > {max_dy:.2f} pts")
-    print(f"↕️ Écarts Y pour '{keyword}':")
-
-    output = []
-    logs = []
-
-    highlight_indices = []
-
-    for i in range(len(y_val_list) - 1):
-        y1, v1 = y_val_list[i]
-        y2, v2 = y_val_list[i + 1]
-        dy = abs(y2 - y1)
-
-        print(f"  dy[{i}] = {dy:.2f} pts entre {v1} et {v2}")
-
-        output.append(v1)
+# = Y gaps between the values of a column : gap > 1.3 x median -> hole (None inserted in the values),
+#   gap < 0.7 x median -> both values highlighted. Diffs and median computed once per column (NumPy),
+#   thresholds in Decimal as before so the classification of borderline gaps does not change
+#
+def analyser_ecarts_y(series):
+    """
+    Toutes les colonnes d'une page en un appel.
+    series : {mot_clé: [(y, valeur)]} -> {mot_clé: (valeurs, logs, highlight_indices)}
+    """
+    resultats = {}
+    for keyword, y_val_list in series.items():
+        if len(y_val_list) < 3:
+            resultats[keyword] = ([v for _, v in y_val_list], [], [])
+
+    colonnes = [k for k, y_val_list in series.items() if len(y_val_list) >= 3]
+    if not colonnes:
+        return resultats
+
+    # All the columns sorted at once : by column, then by Y (stable, as sorted() on y)
+    tailles = np.array([len(series[k]) for k in colonnes])
+    y = np.fromiter((y for k in colonnes for y, _ in series[k]), dtype=float, count=int(tailles.sum()))
+    groupes = np.repeat(np.arange(len(colonnes)), tailles)
+    ordre = np.lexsort((y, groupes))
+    y = y[ordre]
+    valeurs = [v for k in colonnes for _, v in series[k]]
+    debuts = np.r_[0, np.cumsum(tailles)[:-1]]
+
+    for n_col, keyword in enumerate(colonnes):
+        debut, n = debuts[n_col], tailles[n_col]
+        y_col = y[debut:debut + n]
+        vals = [valeurs[i] for i in ordre[debut:debut + n].tolist()]
+
+        dy = np.diff(y_col)
+        median_dy = float(np.median(dy))
+        median_dec = Decimal(str(median_dy))
+        min_dy = float(median_dec * Decimal("0.7"))
+        max_dy = float(median_dec * Decimal("1.3"))
+        trou = dy > max_dy
+        petit = dy < min_dy
+
+        # Position of each value in the output : shifted by the holes (None) inserted before it
+        positions = np.arange(n) + np.r_[0, np.cumsum(trou)]
+        output = [None] * (n + int(trou.sum()))
+        for p, v in zip(positions.tolist(), vals):
+            output[p] = v
+        highlight_indices = np.column_stack((positions[:-1][petit], positions[:-1][petit] + 1)).ravel().tolist()
+
+        logs = []
+        for i in np.flatnonzero(trou | petit).tolist():
+            ecart = Decimal(str(dy[i]))
+            if trou[i]:
+                logs.append(f" NULL : Trou détecté pour '{keyword}' entre {vals[i]} et {vals[i + 1]} (écart Y = {ecart:.1f} pts)")
+            else:
+                logs.append(f" ⚠️  : Espacement trop petit pour '{keyword}' entre {vals[i]} et {vals[i + 1]} (écart Y = {ecart:.1f} pts)")
+
+        print(f"\n📏 Médiane des écarts Y pour '{keyword}': {median_dy:.2f} pts "
+              f"(trop petit: < {0.7 * median_dy:.2f} | trop grand: > {1.3 * median_dy:.2f}) "
+              f"→ {int(trou.sum())} trous, {int(petit.sum())} espacements trop petits")
+        resultats[keyword] = (output, logs, highlight_indices)
+
+    return resultats
 
-        dy = Decimal(str(y2 - y1))
-        median_dy = Decimal(str(statistics.median(dy_list)))
-        min_dy = median_dy * Decimal("0.7")
-        max_dy = median_dy * Decimal("1.3")
 
-        if dy > max_dy:
-            print("    → TROU détecté")
-            output.append(None)
-            logs.append(f" NULL : Trou détecté pour '{keyword}' entre {v1} et {v2} (écart Y = {dy:.1f} pts)")
-        elif dy < min_dy:
-            print("    → TROP PETIT")
-            highlight_indices.append(len(output) - 1)
-            highlight_indices.append(len(output))
-            logs.append(f" ⚠️  : Espacement trop petit pour '{keyword}' entre {v1} et {v2} (écart Y = {dy:.1f} pts)")
+def detect_y_anomalies(y_val_list, keyword):
+    # (values with None for the holes, logs, indices of the values to highlight)
+    return analyser_ecarts_y({keyword: y_val_list})[keyword]
 
-    output.append(y_val_list[-1][1])  # Dernière valeur
 
-    return output, logs, highlight_indices
+PATTERN_SONDAGE = re.compile(r"\bSP\d{1,4}\b")
+DEPTH_KEYWORDS = ["Profondeur", "Prof.", "Prof", "Depth"]  # headers of the depth column, first one found is used
+# Depth values searched under the whole header word (x0 - left to x1 + right) : left / right aligned values
+# under a wide header like "Profondeur" are found, not only the ones near its center
+DEPTH_TOLERANCE = {"left": 10, "right": 10, "min_dy": 50}
 
 
 def detect_sondage_name(words):
-    pattern = re.compile(r"\bSP\d{1,4}\b")
+    # words : list of words or IndexMots of the page
+    if isinstance(words, IndexMots):
+        return words.premier_motif(PATTERN_SONDAGE)
     for w in words:
         text = w.get('text', '')
-        if pattern.fullmatch(text.strip()):
+        if PATTERN_SONDAGE.fullmatch(text.strip()):
             return text.strip()
     return None
 
 
 
 class PDFKeywordExtractor:
-    def __init__(self, pdf_path, keywords, dpi=150, tolerances=None, column_distance_threshold=15):
+    def __init__(self, pdf_path, keywords, dpi=150, tolerances=None, column_distance_threshold=15, source_mots=None,
+                 depth_keywords=None, depth_tolerance=None):
         self.pdf_path = pdf_path
+        self.source_mots = source_mots  # "pymupdf" / "pdfplumber" / None (EXTRACTPDF_WORD_SOURCE, see word_source)
         self.keywords = keywords
+        self.depth_keywords = depth_keywords or DEPTH_KEYWORDS
+        self.depth_tolerance = depth_tolerance or DEPTH_TOLERANCE
         self.dpi = dpi
         self.column_distance_threshold = column_distance_threshold
         self.drag_data = {}
@@ -104,18 +147,21 @@ class PDFKeywordExtractor:
         return val * self.dpi / 72
 
     def get_keyword_x_positions(self, words):
+        # words : list of words or IndexMots of the page
+        index = words if isinstance(words, IndexMots) else IndexMots(words)
         positions = {}
         for kw in self.keywords:
-            for w in words:
-                if w['text'].strip().lower() == kw.lower():
-                    x = (w['x0'] + w['x1']) / 2
-                    positions[kw] = x
-                    break
+            i = index.chercher(kw)
+            if i is not None:
+                positions[kw] = float(index.x_centre[i])
         return positions
 
     # =========================== DEBUG =======================================
     #
     def highlight_keywords_on_page(self, page):
+        import matplotlib.pyplot as plt  # debug only : not loaded by the headless / batch workers
+        from matplotlib.patches import Rectangle
+
         words = page.extract_words()
         im = page.to_image(resolution=self.dpi)
         pil_image = im.original
@@ -450,8 +496,7 @@ class PDFKeywordExtractor:
                 if d_start >= d_end or d_step <= 0:
                     raise ValueError
 
-                for i in range(int((d_end - d_start) / d_step) + 1):
-                    depth_values.append(round(d_start + i * d_step, 3))
+                depth_values.extend(depth_list(d_start, d_end, d_step))
 
                 win.destroy()
             except ValueError:
@@ -486,8 +531,10 @@ class PDFKeywordExtractor:
 
 
     def extract_values_near_keyword(self, words, keyword):
-        ref_word = next((w for w in words if w['text'].strip().lower() == keyword.lower()), None)
-        if not ref_word:
+        # words : list of words or IndexMots of the page
+        index = words if isinstance(words, IndexMots) else IndexMots(words)
+        i_ref = index.chercher(keyword)
+        if i_ref is None:
             return []
 
         tol = self.tolerances.get(keyword, {
@@ -496,115 +543,221 @@ class PDFKeywordExtractor:
             "min_dy": 50
         })
 
-        x_ref = (ref_word['x0'] + ref_word['x1']) / 2
-        y_ref = ref_word['top']
-
-        values = []
-        for w in words:
-            try:
-                val = float(w['text'].replace(",", "."))
-            except ValueError:
-                continue
-
-            x_c = (w['x0'] + w['x1']) / 2
-            y_c = w['top']
+        x_ref = index.x_centre[i_ref]
+        y_ref = index.top[i_ref]
+        return index.valeurs_colonne(x_ref, y_ref + tol['min_dy'], tol['left'], tol['right'])
 
-            if (x_ref - tol['left'] <= x_c <= x_ref + tol['right']) and (y_c > y_ref + tol['min_dy']):
-                values.append((y_c, val))
 
-        return sorted(values, key=lambda x: x[0])
 
 
 
+    # = PROCESSING OF ONE PAGE : no UI, result of the page only (merged afterwards by sondage)
+    #
+    def extract_page(self, words, page_idx):
+        """
+        Valeurs d'une page : {"pdf", "page", "sondage", "Pf*", "Pl*", "Module", "RedFlags", "Logs", "DepthDetected"},
+        None si les données Pf / Pl combinées sont incohérentes (page sautée).
+        """
+        words = words if isinstance(words, IndexMots) else IndexMots(words)
+        sondage_name = detect_sondage_name(words) or f"Page {page_idx + 1}"
+
+        # Extraction des valeurs par mot-clé
+        values_by_keyword = {}
+        for kw in self.keywords:
+            values = self.extract_values_near_keyword(words, kw)
+            values_by_keyword[kw] = values
+            print(f"🔍 {kw} : {len(values)} valeurs")
+
+        # Vérifie la position de Pf et Pl
+        x_positions = self.get_keyword_x_positions(words)
+        is_combined = False
+        if self.keywords[0] in x_positions and self.keywords[1] in x_positions:
+            distance = abs(x_positions[self.keywords[0]] - x_positions[self.keywords[1]])
+            if distance <= self.column_distance_threshold:
+                is_combined = True
+
+        if is_combined:
+            print("✅ Pf et Pl combinés → traitement spécial")
+            pf_values = values_by_keyword[self.keywords[0]]
+            pl_values = values_by_keyword[self.keywords[1]]
+            if pf_values != pl_values or len(pf_values) % 2 != 0:
+                print("⚠️ Données incohérentes pour traitement spécial. Saut de cette page.")
+                return None
+
+            pf_final, pl_final = [], []
+            for i in range(len(pf_values) - 2, -1, -2):
+                a, b = pf_values[i][1], pf_values[i + 1][1]
+                if a < b:
+                    pf_final.append((pf_values[i][0], a))
+                    pl_final.append((pf_values[i + 1][0], b))
+                else:
+                    pf_final.append((pf_values[i + 1][0], b))
+                    pl_final.append((pf_values[i][0], a))
+
+            pf_final.reverse()
+            pl_final.reverse()
+        else:
+            print("✅ Pf et Pl séparés → traitement standard")
+            pf_final = values_by_keyword[self.keywords[0]]
+            pl_final = values_by_keyword[self.keywords[1]]
+
+        em_values = values_by_keyword[self.keywords[2]]
+
+        # Analyse des anomalies Y
+        anomalies = analyser_ecarts_y({
+            self.keywords[0]: pf_final,
+            self.keywords[1]: pl_final,
+            self.keywords[2]: em_values,
+        })
+        pf_list, pf_logs, pf_red = anomalies[self.keywords[0]]
+        pl_list, pl_logs, pl_red = anomalies[self.keywords[1]]
+        em_list, em_logs, em_red = anomalies[self.keywords[2]]
+
+        return {
+            "pdf": os.path.basename(self.pdf_path),
+            "page": page_idx,
+            "sondage": sondage_name,
+            "Pf*": pf_list,
+            "Pl*": pl_list,
+            "Module": em_list,
+            "RedFlags": {
+                "Pf*": pf_red,
+                "Pl*": pl_red,
+                "Module": em_red
+            },
+            "Logs": pf_logs + pl_logs + em_logs,
+            "DepthDetected": self.extract_depth_column(words),
+        }
 
+    def extract_depth_column(self, words):
+        # Values of the first depth column header found on the page ([] if none)
+        index = words if isinstance(words, IndexMots) else IndexMots(words)
+        tol = self.depth_tolerance
+        for kw in self.depth_keywords:
+            i = index.chercher(kw)
+            if i is None:
+                continue
+            x0, x1 = index.words[i]['x0'], index.words[i]['x1']
+            values = index.valeurs_colonne(x0, index.top[i] + tol['min_dy'], tol['left'], x1 - x0 + tol['right'])
+            if values:
+                return [v for _, v in values]
+        return []
+
+    # = PROCESSING ALL THE PAGES FOR A PDF DOCUMENT, WITHOUT UI
+    # = Depths of a sondage : depth_ranges (config file) > ask_depths(sondage) if given > depth column detected
+    #   in the pages of the sondage > [] (to fill in the validation UI)
+    #
+    def extract_pages(self, plage=None):
+        # Results of the pages (skipped pages left out) ; plage : (debut, fin) 1-indexed, inclusive
+        with ouvrir_source_mots(self.pdf_path, self.source_mots) as source:
+            debut, fin = plage or (1, len(source))
+            for page_idx in range(debut - 1, min(fin, len(source))):
+                print(f"\n📄 Traitement page {page_idx + 1}")
+                page_result = self.extract_page(IndexMots(source.mots(page_idx)), page_idx)
+                if page_result is not None:
+                    yield page_result
 
-    # = PROCESSING ALL THE PAGES FOR A PDF DOCUMENT
-    def process_all_pages(self):
+    def extract_all(self, depth_ranges=None, ask_depths=None):
+        depth_ranges = depth_ranges or {}
         results_by_sondage = {}
         depths_by_sondage = {}
 
-        with pdfplumber.open(self.pdf_path) as pdf:
-            for page_idx, page in enumerate(pdf.pages):
-                print(f"\n📄 Traitement page {page_idx + 1}")
-                words = page.extract_words()
-                sondage_name = detect_sondage_name(words) or f"Page {page_idx + 1}"
-
-                # Extraction des valeurs par mot-clé
-                values_by_keyword = {}
-                for kw in self.keywords:
-                    values = self.extract_values_near_keyword(words, kw)
-                    values_by_keyword[kw] = values
-                    print(f"🔍 {kw} : {len(values)} valeurs")
-
-                # Vérifie la position de Pf et Pl
-                x_positions = self.get_keyword_x_positions(words)
-                is_combined = False
-                if self.keywords[0] in x_positions and self.keywords[1] in x_positions:
-                    distance = abs(x_positions[self.keywords[0]] - x_positions[self.keywords[1]])
-                    if distance <= self.column_distance_threshold:
-                        is_combined = True
-
-                if is_combined:
-                    print("✅ Pf et Pl combinés → traitement spécial")
-                    pf_values = values_by_keyword[self.keywords[0]]
-                    pl_values = values_by_keyword[self.keywords[1]]
-                    if pf_values != pl_values or len(pf_values) % 2 != 0:
-                        print("⚠️ Données incohérentes pour traitement spécial. Saut de cette page.")
-                        continue
-
-                    pf_final, pl_final = [], []
-                    for i in range(len(pf_values) - 2, -1, -2):
-                        a, b = pf_values[i][1], pf_values[i + 1][1]
-                        if a < b:
-                            pf_final.append((pf_values[i][0], a))
-                            pl_final.append((pf_values[i + 1][0], b))
-                        else:
-                            pf_final.append((pf_values[i + 1][0], b))
-                            pl_final.append((pf_values[i][0], a))
-
-                    pf_final.reverse()
-                    pl_final.reverse()
-                else:
-                    print("✅ Pf et Pl séparés → traitement standard")
-                    pf_final = values_by_keyword[self.keywords[0]]
-                    pl_final = values_by_keyword[self.keywords[1]]
-
-                em_values = values_by_keyword[self.keywords[2]]
-
-                # Analyse des anomalies Y
-                pf_list, pf_logs, pf_red = detect_y_anomalies(pf_final, self.keywords[0])
-                pl_list, pl_logs, pl_red = detect_y_anomalies(pl_final, self.keywords[1])
-                em_list, em_logs, em_red = detect_y_anomalies(em_values, self.keywords[2])
-
-                # Une seule demande de profondeur par sondage
-                if sondage_name not in depths_by_sondage:
-                    depths_by_sondage[sondage_name] = self.ask_user_for_depth_range(sondage_name)
-                depths = depths_by_sondage[sondage_name]
-
-                # Ajout ou accumulation des données par sondage
-                if sondage_name not in results_by_sondage:
-                    results_by_sondage[sondage_name] = {
-                        "Pf*": pf_list,
-                        "Pl*": pl_list,
-                        "Module": em_list,
-                        "Depth": depths,  # ✅ Ajouté une seule fois ici
-                        "RedFlags": {
-                            "Pf*": pf_red,
-                            "Pl*": pl_red,
-                            "Module": em_red
-                        }
-                    }
-                else:
-                    results_by_sondage[sondage_name]["Pf*"] += pf_list
-                    results_by_sondage[sondage_name]["Pl*"] += pl_list
-                    results_by_sondage[sondage_name]["Module"] += em_list
-                    results_by_sondage[sondage_name]["RedFlags"]["Pf*"] += pf_red
-                    results_by_sondage[sondage_name]["RedFlags"]["Pl*"] += pl_red
-                    results_by_sondage[sondage_name]["RedFlags"]["Module"] += em_red
+        for page_result in self.extract_pages():
+            # Une seule demande de profondeur par sondage
+            sondage_name = page_result["sondage"]
+            if ask_depths and sondage_name not in depth_ranges and sondage_name not in depths_by_sondage:
+                depths_by_sondage[sondage_name] = ask_depths(sondage_name)
+
+            add_page_result(results_by_sondage, page_result)
 
+        return resolve_depths(results_by_sondage, {**depths_by_sondage, **depth_ranges})
+
+    def process_all_pages(self, depth_ranges=None):
+        # Interactive mode : depths asked for the sondages missing from depth_ranges, then validation UI
+        results_by_sondage = self.extract_all(depth_ranges, ask_depths=self.ask_user_for_depth_range)
         self.show_validation_ui_with_tabs(results_by_sondage)
 
 
+# = Merge of the result of a page into the results by sondage (pages of a sondage in the reading order)
+# = RedFlags are indices in the values of the page : shifted by the number of values already merged
+# = Pages : [pdf name, page number from 1] -> no ambiguity when a sondage spans several reports
+#
+def add_page_result(results_by_sondage, page_result):
+    sondage_name = page_result["sondage"]
+    if sondage_name not in results_by_sondage:
+        results_by_sondage[sondage_name] = {
+            "Pf*": list(page_result["Pf*"]),
+            "Pl*": list(page_result["Pl*"]),
+            "Module": list(page_result["Module"]),
+            "Depth": [],
+            "DepthDetected": list(page_result["DepthDetected"]),
+            "RedFlags": {key: list(red) for key, red in page_result["RedFlags"].items()},
+            "Logs": list(page_result["Logs"]),
+            "Pages": [[page_result["pdf"], page_result["page"] + 1]],
+        }
+    else:
+        data = results_by_sondage[sondage_name]
+        for key, red in page_result["RedFlags"].items():
+            offset = len(data[key])
+            data["RedFlags"].setdefault(key, []).extend(i + offset for i in red)
+        data["Pf*"] += page_result["Pf*"]
+        data["Pl*"] += page_result["Pl*"]
+        data["Module"] += page_result["Module"]
+        data["DepthDetected"] += page_result["DepthDetected"]
+        data["Logs"] += page_result["Logs"]
+        data["Pages"].append([page_result["pdf"], page_result["page"] + 1])
+    return results_by_sondage
+
+
+def resolve_depths(results_by_sondage, depth_ranges=None):
+    # Depths given (config file / user) first, else the depth column detected in the pages of the sondage
+    depth_ranges = depth_ranges or {}
+    for sondage_name, data in results_by_sondage.items():
+        if sondage_name in depth_ranges:
+            data["Depth"] = list(depth_ranges[sondage_name])
+        else:
+            data["Depth"] = list(data["DepthDetected"])
+            if not data["Depth"]:
+                print(f"⚠️ {sondage_name} : aucune profondeur (ni configurée, ni détectée)")
+    return results_by_sondage
+
+
+# = Files : depth ranges given in advance, results of a headless extraction (JSON, None <-> null)
+#
+def depth_list(d_start, d_end, d_step):
+    return [round(d_start + i * d_step, 3) for i in range(int((d_end - d_start) / d_step) + 1)]
+
+
+def load_depth_ranges(path):
+    """
+    Profondeurs par sondage depuis un JSON :
+    {"SP1": {"start": 1.0, "end": 12.0, "step": 1.0}, "SP2": [1.5, 3.0, 4.5]} -> {"SP1": [1.0, ...], ...}
+    """
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+
+    depth_ranges = {}
+    for sondage_name, value in config.items():
+        if isinstance(value, dict):
+            d_start, d_end, d_step = float(value["start"]), float(value["end"]), float(value["step"])
+            if d_start >= d_end or d_step <= 0:
+                raise ValueError(f"Profondeurs invalides pour {sondage_name} : {value}")
+            depth_ranges[sondage_name] = depth_list(d_start, d_end, d_step)
+        else:
+            depth_ranges[sondage_name] = [float(v) for v in value]
+    return depth_ranges
+
+
+def save_results(results_by_sondage, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results_by_sondage, f, ensure_ascii=False, indent=1)
+    print(f"💾 Résultats enregistrés : {path} ({len(results_by_sondage)} sondages)")
+
+
+def load_results(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
 
 # === Lancement ===
 def choose_pdf():
@@ -616,13 +769,41 @@ def choose_pdf():
     )
 
 
-if __name__ == "__main__":
-    pdf_path = choose_pdf()
-    if pdf_path:
-        extractor = PDFKeywordExtractor(
-            pdf_path,
-            keywords=["Pf*", "Pl*", "Module"],
-        )
-        extractor.process_all_pages()
+# = No argument : PDF chosen in a dialog, interactive extraction then validation UI (as before)
+# = python pdf_sondage_extract.py extract rapport.pdf --depths profondeurs.json --output resultats.json
+#   (no UI, depths from the file or the detected depth columns)
+# = python pdf_sondage_extract.py validate resultats.json (validation UI on saved results)
+#
+KEYWORDS = ["Pf*", "Pl*", "Module"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extraction des essais pressiométriques par sondage")
+    sub = parser.add_subparsers(dest="action")
+    extract = sub.add_parser("extract", help="Extraction sans interface, résultats en JSON")
+    extract.add_argument("pdf")
+    extract.add_argument("--output", "-o", required=True)
+    extract.add_argument("--depths", default=None, help="JSON des profondeurs par sondage")
+    extract.add_argument("--source-mots", default=None, help="pymupdf / pdfplumber")
+    validate = sub.add_parser("validate", help="Interface de validation sur des résultats enregistrés")
+    validate.add_argument("results")
+    args = parser.parse_args(argv)
+
+    if args.action == "extract":
+        depth_ranges = load_depth_ranges(args.depths) if args.depths else None
+        extractor = PDFKeywordExtractor(args.pdf, keywords=KEYWORDS, source_mots=args.source_mots)
+        save_results(extractor.extract_all(depth_ranges), args.output)
+    elif args.action == "validate":
+        extractor = PDFKeywordExtractor(None, keywords=KEYWORDS)  # no PDF : the UI only needs the keywords
+        extractor.show_validation_ui_with_tabs(load_results(args.results))
     else:
-        print("Aucun fichier sélectionné.")
+        pdf_path = choose_pdf()
+        if pdf_path:
+            extractor = PDFKeywordExtractor(pdf_path, keywords=KEYWORDS)
+            extractor.process_all_pages()
+        else:
+            print("Aucun fichier sélectionné.")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,45 +1,94 @@
 import os
 import logging
 
-import re
 import camelot
-import fitz  # PyMuPDF
 
-import pandas as pd
-from pandas import ExcelWriter
+from disk_cache import CacheDisque, hash_fichier
+from table_export import ouvrir_export
+from table_normalize import normaliser_grille, normaliser_tableau
+from page_classifier import PAGE_SCAN, PAGE_TEXTE, PAGE_VECTORIELLE, classer_types_pages
+from keyword_classifier import ClassifieurMotsCles, charger_mots_cles, classer_pages
 
 
 
 # === Script : EXTRACT TABLE FROM PDF ===
 #
-def extraire_pdf_vers_excel(pdf_path, output_dir):
+# = Single Camelot call for a list of pages, raw grids (list of rows) grouped back by page number (str)
+# = Grids are cached on disk by PDF content hash + page + flavor + Camelot options : only missing pages are read
+#
+def lire_tableaux_par_page(pdf_path, pages, flavor, cache=None, **options):
+    grilles_par_page = {}
+    if not pages:
+        return grilles_par_page
+
+    pages_a_lire = list(pages)
+    cles = {}
+    if cache is not None:
+        empreinte = hash_fichier(pdf_path)
+        pages_a_lire = []
+        for page in pages:
+            cles[page] = cache.cle(empreinte, page, flavor, options)
+            grilles = cache.get(cles[page])
+            if grilles is None:
+                pages_a_lire.append(page)
+            else:
+                grilles_par_page[page] = grilles
+        if len(pages_a_lire) < len(pages):
+            print(f"📦 Cache {flavor} : {len(pages) - len(pages_a_lire)}/{len(pages)} pages déjà extraites")
+
+    if pages_a_lire:
+        tables = camelot.read_pdf(pdf_path, pages=",".join(pages_a_lire), flavor=flavor, **options)
+        for page in pages_a_lire:
+            grilles_par_page[page] = []
+        for table in tables:
+            grilles_par_page.setdefault(str(table.page), []).append(table.df.values.tolist())
+
+        if cache is not None:
+            for page in pages_a_lire:
+                cache.set(cles[page], grilles_par_page[page])
+
+    return grilles_par_page
+
+
+# = plage_pages : (debut, fin) 1-indexed, inclusive -> only these pages are scanned (used by batch_extract)
+#
+# = fichier_mots_cles : JSON {classe: [variantes]} (default : mots_cles.json if present, else MOTS_CLES_DEFAUT)
+#
+# = utiliser_cache : Camelot results re-used from disk_cache when the PDF and the options did not change
+# = format_sortie : "xlsx" or "parquet" (page / keyword / source kept for each table, read by mapping_tool)
+# = max_workers_classement : processes for the keyword classification of big PDF (None = cpu_count,
+#   1 inside a batch_extract worker : no process pool inside the pool)
+#
+# = Pages read by Camelot and exported by lots : only the grids of one lot are in memory at a time
+#
+LOT_PAGES_CAMELOT = 10
+
+
+def extraire_pdf_vers_excel(pdf_path, output_dir, plage_pages=None, fichier_mots_cles=None, utiliser_cache=True,
+                            format_sortie="xlsx", max_workers_classement=None):
     # Log message to supress
     logging.getLogger("pdfminer").setLevel(logging.ERROR)
 
     pdf_name = os.path.splitext(os.path.basename(pdf_path))[0]
-    output_file = os.path.join(output_dir, f"{pdf_name}_extraction.xlsx")
-
-    # TO BE MODIFIED TO LET THE USER INPUT WHAT HE WANT
-    keywords = {
-        "Essai laboratoire": ["essai laboratoire", "essais laboratoire", "essais laboratoires", "laboratoire", "laboratoires"],
-        "Essais in situ": ["essai in situ", "essais in situ", "in situ", "insitu", "in-situ"],
-        "Commentaire": ["commentaire", "commentaires"],
-        "Problématique": ["problématique", "problématiques"],
-    }
+    if plage_pages:
+        output_file = os.path.join(output_dir, f"{pdf_name}_extraction_p{plage_pages[0]}-{plage_pages[1]}.{format_sortie}")
+    else:
+        output_file = os.path.join(output_dir, f"{pdf_name}_extraction.{format_sortie}")
 
-    def looks_like_data(row):
-        non_empty = [cell for cell in row if cell and str(cell).strip()]
-        return sum(bool(re.search(r'\d', str(cell))) for cell in non_empty) >= 3
+    classifieur = ClassifieurMotsCles(charger_mots_cles(fichier_mots_cles))
 
-    doc = fitz.open(pdf_path)
     target_pages = []
 
-    for i in range(len(doc)):
-        text = doc.load_page(i).get_text().lower()
-        for canonical, variants in keywords.items():
-            if any(variant in text for variant in variants):
-                target_pages.append((str(i + 1), canonical))
-                break
+    # Page kept with the first class of the keyword table found, every class found is logged
+    for num_page, correspondances in classer_pages(pdf_path, classifieur, plage_pages=plage_pages,
+                                                      max_workers=max_workers_classement):
+        if not correspondances:
+            continue
+        target_pages.append((str(num_page), classifieur.classe_principale(correspondances)))
+
+        classes = classifieur.classes(correspondances)
+        if len(classes) > 1:
+            print(f"🔎 Page {num_page} : " + ", ".join(f"{c} ({len(pos)})" for c, pos in classes.items()))
 
     print(f"🔍 Pages retenues : {target_pages}")
 
@@ -47,115 +96,87 @@ def extraire_pdf_vers_excel(pdf_path, output_dir):
     min_rows = 3
     min_cols = 4
 
-    all_tables = []
-    pages_sans_tableaux = []
+    def assez_grand(grille):
+        return len(grille) >= min_rows and max((len(row) for row in grille), default=0) >= min_cols
 
-    for page, keyword in target_pages:
-        print(f"📄 Traitement de la page {page} - Type : {keyword}")
+    cache = CacheDisque("camelot") if utiliser_cache else None
 
-        # Using multiple option to detect tables
-        # Try LATTICE
-        tables = camelot.read_pdf(
+    pages_sans_tableaux = []
+
+    # Pre-classification of the pages : vector tables -> LATTICE, text without rulings -> STREAM, scans -> OCR
+    types_pages = classer_types_pages(pdf_path, [page for page, _ in target_pages])
+    pages_lattice = [page for page, t in types_pages.items() if t == PAGE_VECTORIELLE]
+    pages_stream = [page for page, t in types_pages.items() if t == PAGE_TEXTE]
+    pages_scan = [page for page, t in types_pages.items() if t == PAGE_SCAN]
+    if pages_scan:
+        print(f"🖼 Pages scannées (OCR, sans Camelot) : {', '.join(pages_scan)}")
+
+    # Camelot grids of a lot of pages : one call per flavor, LATTICE on vector pages, STREAM on the others + failed ones
+    def tableaux_valides(pages_lot):
+        lattice = [page for page in pages_lot if page in pages_lattice]
+        tables_par_page = lire_tableaux_par_page(
             pdf_path,
-            pages=page,
+            lattice,
             flavor="lattice",
+            cache=cache,
             line_scale=40,
             shift_text=["", ""],
             copy_text=["v"],
         )
-        valid_tables = [t for t in tables if t.df.shape[0] >= min_rows and t.df.shape[1] >= min_cols]
-
-        # Try STREAM -- only if LATTICE not valid
-        if not valid_tables:
-            print(f"⚠️ Re-tentative avec flavor=stream sur la page {page}")
-            tables = camelot.read_pdf(
-                pdf_path,
-                pages=page,
-                flavor="stream",
-                strip_text="\n"
-            )
-            valid_tables = [t for t in tables if t.df.shape[0] >= min_rows and t.df.shape[1] >= min_cols]
-
-        # If still no valid table
-        if not valid_tables:
-            print(f"⚠️ Aucun tableau valide détecté sur la page {page}")
-            pages_sans_tableaux.append((int(page), keyword))
-            continue
-
-        tables = valid_tables
-
-
-        for i, table in enumerate(tables):
-            raw_table = table.df.values.tolist()
-
-            # Normalize the table to make sure every row got the same columns number :
-            #   To keep blanks
-            expected_cols = max(len(row) for row in raw_table)
-            normalized = [
-                row + [""] * (expected_cols - len(row)) if len(row) < expected_cols else row
-                for row in raw_table
-            ]
-
-            df = pd.DataFrame(normalized)
-            if df.shape[0] < min_rows or df.shape[1] < min_cols:
-                print(f"🚫 Tableau ignoré (trop petit) - Page {page} Table {i+1} ({df.shape[0]} lignes, {df.shape[1]} colonnes)")
-                continue
-
-
-            data_start_idx = None
-            for idx, row in df.iterrows():
-                if looks_like_data(row):
-                    data_start_idx = idx
-                    break
-
-            if data_start_idx is not None:
-                df_clean = df.iloc[data_start_idx:].copy()
-                sheet_name = f"Page{page}_{keyword}"[:31]
-
-                if keyword not in ["Essai laboratoire", "Essais in situ"]:
-                    has_group_lines = any(
-                        (row[0] and all(str(cell).strip() == "" for cell in row[1:]))
-                        for row in df_clean.values
-                    )
-
-                    if has_group_lines:
-                        df_clean = df_clean[~((df_clean[0].notna()) & (df_clean.iloc[:, 1:].isna().all(axis=1)))]
-                        df_clean = df_clean.replace(r'\n', ' ', regex=True)
-
-
-                num_header_rows = 3
-                header_rows = df.iloc[:num_header_rows].values.tolist()
-
-                fused_headers = []
-                for col_idx in range(df.shape[1]):
-                    parts = []
-                    for row in header_rows:
-                        if col_idx < len(row):
-                            val = str(row[col_idx]).strip()
-                            if val and val.lower() not in ["", "nan"]:
-                                parts.append(val)
-                    header = " ".join(parts).strip()
-                    fused_headers.append(header if header else f"col_{col_idx}")
-
-
-                if any(h.startswith("col_") is False for h in fused_headers):
-                    df_clean.columns = fused_headers
-                else:
-                    df_clean.columns = [f"col_{j}" for j in range(df_clean.shape[1])]
-
-                df_clean.reset_index(drop=True, inplace=True)
-
-                all_tables.append((sheet_name, df_clean))
-            else:
-                print(f"🚫 Aucune ligne de données trouvée - Page {page} Table {i + 1}")
-                pages_sans_tableaux.append((int(page), keyword))
-
-
-    # Excel export
-    if all_tables:
-        with ExcelWriter(output_file, engine="openpyxl") as writer:
-            for name, df in all_tables:
-                df.to_excel(writer, sheet_name=name, index=False)
+        valid_par_page = {
+            page: [t for t in tables_par_page.get(page, []) if assez_grand(t)]
+            for page in lattice
+        }
+        valid_par_page.update({page: [] for page in pages_lot if page in pages_scan})
+
+        # Try STREAM -- only if LATTICE not valid, or directly if the page has no rulings
+        pages_echec = [page for page in lattice if not valid_par_page[page]]
+        if pages_echec:
+            print(f"⚠️ Re-tentative avec flavor=stream sur les pages {', '.join(pages_echec)}")
+        pages_a_streamer = [page for page in pages_lot if page in pages_stream or page in pages_echec]
+        if pages_a_streamer:
+            tables_par_page = lire_tableaux_par_page(pdf_path, pages_a_streamer, flavor="stream", cache=cache,
+                                                     strip_text="\n")
+            for page in pages_a_streamer:
+                valid_par_page[page] = [t for t in tables_par_page.get(page, []) if assez_grand(t)]
+        return valid_par_page
+
+    # Excel / Parquet export : streamed, the tables of a lot of LOT_PAGES_CAMELOT pages are written (and dropped)
+    # before the next lot is read -> memory does not grow with the number of pages
+    with ouvrir_export(output_file, source=os.path.basename(pdf_path)) as export:
+        for n in range(0, len(target_pages), LOT_PAGES_CAMELOT):
+            lot = target_pages[n:n + LOT_PAGES_CAMELOT]
+            valid_par_page = tableaux_valides([page for page, _ in lot])
+
+            for page, keyword in lot:
+                print(f"📄 Traitement de la page {page} - Type : {keyword}")
+                valid_tables = valid_par_page.pop(page)
+
+                # If still no valid table
+                if not valid_tables:
+                    if page in pages_scan:
+                        print(f"🖼 Page {page} scannée : à traiter par OCR")
+                    else:
+                        print(f"⚠️ Aucun tableau valide détecté sur la page {page}")
+                    pages_sans_tableaux.append((int(page), keyword))
+                    continue
+
+                for i, raw_table in enumerate(valid_tables):
+                    df = normaliser_grille(raw_table)
+                    if df.shape[0] < min_rows or df.shape[1] < min_cols:
+                        print(f"🚫 Tableau ignoré (trop petit) - Page {page} Table {i+1} ({df.shape[0]} lignes, {df.shape[1]} colonnes)")
+                        continue
+
+                    df_clean = normaliser_tableau(df, retirer_groupes=keyword not in ["Essai laboratoire", "Essais in situ"])
+                    if df_clean is None:
+                        print(f"🚫 Aucune ligne de données trouvée - Page {page} Table {i + 1}")
+                        pages_sans_tableaux.append((int(page), keyword))
+                        continue
+
+                    # Sheet written right away, name deduplicated by the exporter
+                    export.ajouter_feuille(f"Page{page}_{keyword}", df_clean, page=int(page), mot_cle=keyword)
+
+    if export.nb_feuilles:
         print(f"\n✅ Export terminé dans : {output_file}")
     else:
         print("\n❌ Aucun tableau pertinent trouvé.")
@@ -0,0 +1,138 @@
+import os
+import sys
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from word_source import ouvrir_source_mots
+from pdf_sondage_extract import (PDFKeywordExtractor, KEYWORDS, PATTERN_SONDAGE, add_page_result, resolve_depths,
+                                 load_depth_ranges, save_results)
+
+
+# === Script : BATCH ENGINE - BOREHOLE EXTRACTION (pdf_sondage_extract) ON MANY PDF WITH A PROCESS POOL ===
+# = Every PDF, or page range of PAGES_PAR_TACHE pages of a big PDF, is a task sent to a worker process
+#   (no UI : depths from the config file or the detected depth columns)
+# = The workers send back the results of their pages, merged in the main process in a fixed order
+#   (order of the PDF, then of the pages) : same results_by_sondage whatever the order the tasks end in
+# = Pages without a sondage name ("Page N") are named after their PDF so they don't mix between reports
+# = Progress messages (same as batch_extract, no end message : the caller knows it when the function returns) :
+#       ("debut", pdf_path, plage)
+#       ("fin", pdf_path, plage, nb_pages_extraites)
+#       ("erreur", pdf_path, plage, message)
+#
+PAGES_PAR_TACHE = 20
+
+
+def decouper_taches(pdf_paths, pages_par_tache=PAGES_PAR_TACHE, source_mots=None):
+    # One task per PDF, or one task per page range if the PDF is bigger than pages_par_tache
+    taches = []
+    for pdf_path in pdf_paths:
+        if not pages_par_tache:
+            taches.append((pdf_path, None))
+            continue
+
+        with ouvrir_source_mots(pdf_path, source_mots) as source:
+            nb_pages = len(source)
+
+        if nb_pages <= pages_par_tache:
+            taches.append((pdf_path, None))
+            continue
+
+        for debut in range(1, nb_pages + 1, pages_par_tache):
+            fin = min(debut + pages_par_tache - 1, nb_pages)
+            taches.append((pdf_path, (debut, fin)))
+    return taches
+
+
+def _traiter_tache(pdf_path, plage, keywords, source_mots, file_progression):
+    if file_progression is not None:
+        file_progression.put(("debut", pdf_path, plage))
+    try:
+        extractor = PDFKeywordExtractor(pdf_path, keywords, source_mots=source_mots)
+        page_results = list(extractor.extract_pages(plage))
+    except Exception as e:
+        if file_progression is not None:
+            file_progression.put(("erreur", pdf_path, plage, str(e)))
+        raise
+    if file_progression is not None:
+        file_progression.put(("fin", pdf_path, plage, len(page_results)))
+    return page_results
+
+
+def _nommer_page_sans_sondage(page_result, pdf_path):
+    if not PATTERN_SONDAGE.fullmatch(page_result["sondage"]):
+        pdf_name = os.path.splitext(os.path.basename(pdf_path))[0]
+        page_result["sondage"] = f"{pdf_name} - {page_result['sondage']}"
+    return page_result
+
+
+def fusionner_resultats(page_results_par_pdf, depth_ranges=None):
+    """
+    page_results_par_pdf : [(pdf_path, [résultats de page])] dans l'ordre des PDF.
+    Fusion par sondage dans l'ordre des PDF puis des pages -> results_by_sondage (profondeurs résolues).
+    """
+    results_by_sondage = {}
+    for pdf_path, page_results in page_results_par_pdf:
+        for page_result in sorted(page_results, key=lambda r: r["page"]):
+            page_result = _nommer_page_sans_sondage(page_result, pdf_path)
+            add_page_result(results_by_sondage, page_result)  # "Pages" : [pdf name, page number]
+    return resolve_depths(results_by_sondage, depth_ranges)
+
+
+def extraire_sondages_lot(pdf_paths, depth_ranges=None, keywords=None, max_workers=None,
+                          pages_par_tache=PAGES_PAR_TACHE, source_mots=None, file_progression=None):
+    """
+    Extraction sans interface des sondages de tous les PDF via un pool de processus.
+    Retourne (results_by_sondage, erreurs) avec erreurs = {pdf_path: message}.
+    file_progression doit pouvoir être transmise aux workers : multiprocessing.Manager().Queue()
+    """
+    keywords = keywords or KEYWORDS
+    taches = decouper_taches(pdf_paths, pages_par_tache, source_mots)
+    max_workers = max_workers or os.cpu_count() or 1
+    max_workers = max(1, min(max_workers, len(taches) or 1))
+
+    resultats_par_tache = {}
+    erreurs = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(_traiter_tache, pdf_path, plage, keywords, source_mots, file_progression): (pdf_path, plage)
+            for pdf_path, plage in taches
+        }
+        for future in as_completed(futures):
+            tache = futures[future]
+            try:
+                resultats_par_tache[tache] = future.result()
+            except Exception as e:
+                erreurs.setdefault(tache[0], []).append(str(e))
+
+    # Order of the tasks = order of the PDF then of the page ranges, whatever the order they ended in
+    page_results_par_pdf = []
+    for pdf_path in pdf_paths:
+        page_results = [r for tache in taches if tache[0] == pdf_path and tache in resultats_par_tache
+                        for r in resultats_par_tache[tache]]
+        page_results_par_pdf.append((pdf_path, page_results))
+    results_by_sondage = fusionner_resultats(page_results_par_pdf, depth_ranges)
+    return results_by_sondage, {pdf_path: " | ".join(messages) for pdf_path, messages in erreurs.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extraction des sondages de plusieurs PDF en parallèle")
+    parser.add_argument("pdf", nargs="+")
+    parser.add_argument("--output", "-o", required=True)
+    parser.add_argument("--depths", default=None, help="JSON des profondeurs par sondage")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--pages-par-tache", type=int, default=PAGES_PAR_TACHE)
+    parser.add_argument("--source-mots", default=None, help="pymupdf / pdfplumber")
+    args = parser.parse_args(argv)
+
+    depth_ranges = load_depth_ranges(args.depths) if args.depths else None
+    results_by_sondage, erreurs = extraire_sondages_lot(args.pdf, depth_ranges, max_workers=args.workers,
+                                                        pages_par_tache=args.pages_par_tache,
+                                                        source_mots=args.source_mots)
+    for pdf_path, message in erreurs.items():
+        print(f"❌ {os.path.basename(pdf_path)} : {message}")
+    save_results(results_by_sondage, args.output)
+    return 1 if erreurs else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+import os
+import re
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+
+# === Script : STREAMING EXPORT OF THE EXTRACTED TABLES ===
+# = Each sheet is written as soon as its table is ready (openpyxl write-only mode) :
+#   the DataFrames are not kept until the end, memory does not grow with the number of tables
+# = Sheet names : forbidden characters replaced, 31 characters max, deduplicated (Page3_Essai, Page3_Essai_2...)
+# = Parquet output (optional, needs pyarrow) : same sheets in one long table, one row per cell :
+#       feuille | source | page | mot_cle | ligne | colonne | valeur | nombre | entier
+#   ligne 0 = header row (as the first row of the Excel sheet). Typed cells as in the xlsx : text in valeur,
+#   floats in nombre, integers in entier, empty cells (None / NaN / "") null everywhere
+#
+LONGUEUR_MAX_FEUILLE = 31
+CARACTERES_INTERDITS = re.compile(r"[\[\]:*?/\\]")
+
+
+def nom_feuille_unique(nom, noms_existants):
+    nom = CARACTERES_INTERDITS.sub("_", str(nom)).strip("'") or "Feuille"
+    candidat = nom[:LONGUEUR_MAX_FEUILLE]
+    n = 2
+    while candidat.lower() in noms_existants:
+        suffixe = f"_{n}"
+        candidat = nom[:LONGUEUR_MAX_FEUILLE - len(suffixe)] + suffixe
+        n += 1
+    return candidat
+
+
+class ExportExcel:
+    def __init__(self, output_file):
+        self.output_file = output_file
+        self.noms_feuilles = []
+        self._noms_existants = set()
+        self._wb = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # No partial file if the extraction failed
+        if exc_type is None:
+            self.fermer()
+        return False
+
+    @property
+    def nb_feuilles(self):
+        return len(self.noms_feuilles)
+
+    def ajouter_feuille(self, nom, df, index=False, page=None, mot_cle=None):
+        # Same layout as df.to_excel(writer, sheet_name=nom, index=index) : header row then values
+        # page / mot_cle : only kept by the Parquet export
+        if self._wb is None:
+            self._wb = Workbook(write_only=True)
+
+        nom = nom_feuille_unique(nom, self._noms_existants)
+        self._noms_existants.add(nom.lower())
+        self.noms_feuilles.append(nom)
+
+        ws = self._wb.create_sheet(title=nom)
+        if index:
+            df = df.reset_index()
+        ws.append([str(c) if not isinstance(c, (int, float)) else c for c in df.columns])
+
+        valeurs = df.astype(object).where(df.notna(), None)
+        for row in valeurs.itertuples(index=False, name=None):
+            ws.append(row)
+        return nom
+
+    def fermer(self):
+        # Saves the workbook if at least one sheet was written, returns the number of sheets
+        if self._wb is not None:
+            self._wb.save(self.output_file)
+            self._wb = None
+        return self.nb_feuilles
+
+
+class ExportParquet:
+    def __init__(self, output_file, source=None):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("L'export Parquet nécessite pyarrow : pip install pyarrow")
+        self._pa, self._pq = pa, pq
+
+        self.output_file = output_file
+        self.source = source
+        self.noms_feuilles = []
+        self._noms_existants = set()
+        self._writer = None
+        self.schema = pa.schema([
+            ("feuille", pa.string()),
+            ("source", pa.string()),
+            ("page", pa.int32()),
+            ("mot_cle", pa.string()),
+            ("ligne", pa.int32()),
+            ("colonne", pa.int32()),
+            ("valeur", pa.string()),
+            ("nombre", pa.float64()),
+            ("entier", pa.int64()),
+        ])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # No partial file if the extraction failed (as ExportExcel)
+        if exc_type is None:
+            self.fermer()
+        elif self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            os.remove(self.output_file)
+        return False
+
+    @property
+    def nb_feuilles(self):
+        return len(self.noms_feuilles)
+
+    @staticmethod
+    def _typer(valeurs):
+        # Cell values -> (valeur, nombre, entier) columns, one of the three set per cell
+        textes, nombres, entiers = [], [], []
+        for v in valeurs:
+            texte = nombre = entier = None
+            if isinstance(v, (bool, np.bool_)):
+                texte = str(v)
+            elif isinstance(v, (int, np.integer)):
+                entier = int(v)
+            elif isinstance(v, (float, np.floating)):
+                nombre = None if np.isnan(v) else float(v)
+            elif v is not None and v != "":
+                texte = str(v)
+            textes.append(texte)
+            nombres.append(nombre)
+            entiers.append(entier)
+        return textes, nombres, entiers
+
+    def ajouter_feuille(self, nom, df, index=False, page=None, mot_cle=None):
+        # One row group per sheet, written right away
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self.output_file, self.schema)
+
+        nom = nom_feuille_unique(nom, self._noms_existants)
+        self._noms_existants.add(nom.lower())
+        self.noms_feuilles.append(nom)
+
+        if index:
+            df = df.reset_index()
+        nb_lignes, nb_colonnes = df.shape
+
+        # Header as written by ExportExcel : numbers kept, anything else as text
+        entete = [c if isinstance(c, (int, float, np.integer, np.floating)) else str(c) for c in df.columns]
+        valeurs = df.astype(object).where(df.notna(), None).to_numpy().ravel().tolist()
+        textes, nombres, entiers = self._typer(entete + valeurs)
+        nb = len(textes)
+
+        table = self._pa.table({
+            "feuille": [nom] * nb,
+            "source": [self.source] * nb,
+            "page": [page] * nb,
+            "mot_cle": [mot_cle] * nb,
+            "ligne": np.repeat(np.arange(nb_lignes + 1, dtype=np.int32), nb_colonnes),
+            "colonne": np.tile(np.arange(nb_colonnes, dtype=np.int32), nb_lignes + 1),
+            "valeur": textes,
+            "nombre": nombres,
+            "entier": entiers,
+        }, schema=self.schema)
+        self._writer.write_table(table)
+        return nom
+
+    def fermer(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        return self.nb_feuilles
+
+
+def ouvrir_export(output_file, source=None):
+    # Exporter chosen by the extension of the output file (.xlsx / .parquet)
+    if output_file.lower().endswith(".parquet"):
+        return ExportParquet(output_file, source=source)
+    return ExportExcel(output_file)
+
+
+def lister_feuilles_parquet(path):
+    import pyarrow.parquet as pq
+    feuilles = pq.read_table(path, columns=["feuille"]).column("feuille").to_pylist()
+    return list(dict.fromkeys(feuilles))
+
+
+def lire_feuilles_parquet(path, feuilles=None):
+    """
+    Relit un export Parquet : {feuille: DataFrame} comme pd.read_excel(path, sheet_name=feuilles),
+    la ligne 0 donnant les en-têtes, cellules vides en NaN, colonnes numériques typées.
+    """
+    import pyarrow.parquet as pq
+    filtres = [("feuille", "in", list(feuilles))] if feuilles is not None else None
+    # nombre / entier absent from the files written before the typed cells : text only
+    typees = [c for c in ("nombre", "entier") if c in pq.read_schema(path).names]
+    cellules = pq.read_table(path, columns=["feuille", "ligne", "colonne", "valeur"] + typees,
+                             filters=filtres).to_pandas()
+
+    # One value per cell : the text, else the float, else the integer (Python objects, NaN if empty)
+    valeur = cellules["valeur"].astype(object)
+    if "nombre" in typees:
+        valeur = valeur.where(valeur.notna(), cellules["nombre"].astype(object))
+    if "entier" in typees:
+        entiers = pd.Series([None if pd.isna(v) else int(v) for v in cellules["entier"]], index=cellules.index,
+                            dtype=object)
+        valeur = valeur.where(valeur.notna(), entiers)
+    cellules["valeur"] = valeur.where(valeur.notna(), np.nan)
+
+    resultats = {}
+    for nom, groupe in cellules.groupby("feuille", sort=False):
+        grille = groupe.pivot(index="ligne", columns="colonne", values="valeur").sort_index()
+        df = pd.DataFrame(grille.iloc[1:].to_numpy(), columns=grille.iloc[0].tolist())
+        resultats[nom] = df.infer_objects()
+
+    noms = feuilles if feuilles is not None else list(resultats)
+    return {nom: resultats[nom] for nom in noms if nom in resultats}
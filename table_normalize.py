@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+
+# === Script : TABLE NORMALIZATION (VECTORIZED) ===
+# = Shared by the Camelot path (pdf_table_extract) and the OCR path (image_table_extract) :
+#       raw grid -> rectangular DataFrame -> first data row -> group lines removed -> fused headers
+#
+MIN_CELLULES_CHIFFRES = 3   # a data row got at least this number of cells with digits
+NB_LIGNES_ENTETE = 3
+
+
+def normaliser_grille(raw_table):
+    # Every row gets the same columns number, blanks are kept as ""
+    expected_cols = max((len(row) for row in raw_table), default=0)
+    return pd.DataFrame([list(row) + [""] * (expected_cols - len(row)) for row in raw_table])
+
+
+def cellules_avec_chiffres(df):
+    # Boolean frame : True where the cell contains a digit (NaN / None -> False)
+    return df.apply(lambda col: col.astype(str).str.contains(r"\d", regex=True) & col.notna())
+
+
+def premiere_ligne_donnees(df, min_cellules=MIN_CELLULES_CHIFFRES):
+    # Position of the first row with enough cells containing digits, None if there is none
+    lignes_donnees = cellules_avec_chiffres(df).sum(axis=1).to_numpy() >= min_cellules
+    if not lignes_donnees.any():
+        return None
+    return int(lignes_donnees.argmax())
+
+
+def retirer_lignes_groupe(df):
+    # Group lines : text in the first column only (blank = NaN / None / "" after strip) -> removed,
+    # and line breaks replaced by spaces
+    if df.shape[1] < 2:
+        return df
+
+    premiere_remplie = df.iloc[:, 0].notna() & df.iloc[:, 0].astype(str).str.strip().ne("")
+    reste_vide = df.iloc[:, 1:].apply(lambda col: col.isna() | col.astype(str).str.strip().eq("")).all(axis=1)
+    lignes_groupe = premiere_remplie & reste_vide
+    if not lignes_groupe.any():
+        return df
+
+    return df[~lignes_groupe].replace(r"\n", " ", regex=True)
+
+
+def fusionner_entetes(df, nb_lignes=NB_LIGNES_ENTETE):
+    # Column-wise fusion of the first rows, "col_i" when a column has no header
+    entetes = np.char.strip(df.iloc[:nb_lignes].to_numpy().astype(str))
+    valides = (entetes != "") & (np.char.lower(entetes) != "nan")
+    fusion = [" ".join(col[ok]) for col, ok in zip(entetes.T, valides.T)]
+    return [h if h else f"col_{j}" for j, h in enumerate(fusion)]
+
+
+def normaliser_tableau(df, retirer_groupes=False, nb_lignes_entete=NB_LIGNES_ENTETE):
+    """
+    Retourne le tableau à partir de sa première ligne de données, avec les en-têtes fusionnés,
+    ou None si aucune ligne de données n'est trouvée.
+    """
+    data_start_idx = premiere_ligne_donnees(df)
+    if data_start_idx is None:
+        return None
+
+    df_clean = df.iloc[data_start_idx:].copy()
+    if retirer_groupes:
+        df_clean = retirer_lignes_groupe(df_clean)
+
+    fused_headers = fusionner_entetes(df, nb_lignes_entete)
+    if any(not h.startswith("col_") for h in fused_headers):
+        df_clean.columns = fused_headers
+    else:
+        df_clean.columns = [f"col_{j}" for j in range(df_clean.shape[1])]
+
+    return df_clean.reset_index(drop=True)
@@ -3,78 +3,88 @@ import re
 import cv2
 import numpy as np
 import pytesseract
-import pandas as pd
 import os
 from PIL import Image
 
+from grid_detect import detecter_grilles, empiler_tableaux
+from image_table_extract import assembler_tableau
+from ocr_pool import executeur_partage
+from ocr_words import (SEUIL_CONFIANCE, confiance_min, config_numerique, ocr_cascade, ocr_grille_bandes,
+                       texte_des_mots, typer_cellules)
+from table_export import ExportExcel
+
 pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
 
 def extraire_table_depuis_image(image_path, output_excel="ocr_grid_output.xlsx", zoom_factor=3):
+    # zoom_factor : only used for the cells read again with a low confidence
     img = cv2.imread(image_path)
     if img is None:
         print("❌ Image introuvable.")
         return
 
-    # ZOOM to test
-    img = cv2.resize(img, (img.shape[1]*zoom_factor, img.shape[0]*zoom_factor), interpolation=cv2.INTER_CUBIC)
+    # Grid found on the image at its own resolution, reduced by 2 (grid_detect) : no 3x upsampling
+    # nor bilateral filter on the whole image
     gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    gray = cv2.bilateralFilter(gray, 9, 75, 75)
-
-    # TEST
-    _, binary = cv2.threshold(gray, 128, 255, cv2.THRESH_BINARY_INV)
-
-    # Trying to catch lines (h,v)
-    horizontal_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (40, 1))
-    detect_horizontal = cv2.morphologyEx(binary, cv2.MORPH_OPEN, horizontal_kernel, iterations=2)
-
-    vertical_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, 40))
-    detect_vertical = cv2.morphologyEx(binary, cv2.MORPH_OPEN, vertical_kernel, iterations=2)
-
-
-    table_mask = cv2.add(detect_horizontal, detect_vertical)
-
-    # Trying to catch cells
-    contours, _ = cv2.findContours(table_mask, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
-    boxes = [cv2.boundingRect(c) for c in contours]
-    boxes = [b for b in boxes if b[2] > 30 and b[3] > 20]
+    longueur_ligne = max(3, round(40 / zoom_factor))
+    cellules = empiler_tableaux(detecter_grilles(gray, facteur=2, seuil=128, longueur_ligne=longueur_ligne))
+
+    def zoom(roi):
+        return cv2.resize(roi, None, fx=zoom_factor, fy=zoom_factor, interpolation=cv2.INTER_CUBIC)
+
+    def zoom_binaire(roi):
+        roi = cv2.cvtColor(zoom(roi), cv2.COLOR_BGR2GRAY)
+        return cv2.threshold(roi, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1]
+
+    # Cascade for the hard cells : zoomed, then zoomed + binarized
+    etapes = [
+        (zoom, {"zoom": zoom_factor, "interpolation": "cubic"}, zoom_factor),
+        (zoom_binaire, {"zoom": zoom_factor, "interpolation": "cubic", "binarisation": "otsu"}, zoom_factor),
+    ]
+    config = "--psm 6 -c preserve_interword_spaces=1" # NEW CONFIG TO TEST WITH PSM 6 7 8 9 10 etc
+
+    # OCR by strips at native resolution : one call per row strip of the grid, words given back to the cells
+    # Numeric columns (found on the first rows) : one strip per column with a digit whitelist
+    mots_par_cellule, couvertes, numeriques = ocr_grille_bandes(img, cellules, lang="fra", config=config)
+
+    # Re-read cell by cell with the cascade : low-confidence cells, cells with ink but no word,
+    # cells spanning several rows. Blank cells (no ink) not OCR'd
+    relues = 0
+    for i, c in enumerate(cellules):
+        if c.get("vide"):
+            c["texte"] = ""
+        elif i not in couvertes or confiance_min(mots_par_cellule.get(i, [])) < SEUIL_CONFIANCE:
+            x, y, w, h = c["box"]
+            config_cellule = config_numerique() if c["colonne"] in numeriques and c["nb_colonnes"] == 1 else config
+            mots, _ = ocr_cascade(img[y:y + h, x:x + w], etapes, lang="fra", config=config_cellule)
+            c["texte"] = texte_des_mots(mots)
+            relues += 1
+    print(f"   {len(cellules)} cellules, {relues} relues une par une")
+
+    for c in cellules:
+        text = re.sub(r"[^\x00-\x7F]+", " ", c["texte"].strip())
+        c["texte"] = re.sub(r"\s+", " ", text)
+    typer_cellules(cellules, numeriques)
+    df = assembler_tableau(cellules)
 
-
-    rows = {}
-    for box in boxes:
-        x, y, w, h = box
-        row_key = y // 10
-        rows.setdefault(row_key, []).append(box)
-
-
-    sorted_rows = []
-    for row_key in sorted(rows.keys()):
-        row = sorted(rows[row_key], key=lambda b: b[0])  # tri x (colonne)
-        sorted_rows.append(row)
-
-    # OCR cells by cells TEST
-    tableau = []
-    for row in sorted_rows:
-        ligne = []
-        for x, y, w, h in row:
-            roi = img[y:y + h, x:x + w]
-            config = "--psm 6 -c preserve_interword_spaces=1" # NEW CONFIG TO TEST WITH PSM 6 7 8 9 10 etc
-            text = pytesseract.image_to_string(roi, config = config, lang="fra").strip()
-            text = re.sub(r"[^\x00-\x7F]+", " ", text)
-            text = re.sub(r"\s+", " ", text)
-            ligne.append(text)
-        tableau.append(ligne)
-
-    df = pd.DataFrame(tableau)
     sheet = os.path.splitext(os.path.basename(image_path))[0][:31]
-    df.to_excel(output_excel, sheet_name=sheet, index=False)
+    if output_excel:
+        df.to_excel(output_excel, sheet_name=sheet, index=False)
     return os.path.splitext(os.path.basename(image_path))[0][:31], df
 
-def extraire_plusieurs_images(image_paths, output_excel="ocr_grid_output.xlsx"):
-    with pd.ExcelWriter(output_excel, engine="openpyxl") as writer:
-        for image_path in image_paths:
-            print(f"🔍 Traitement : {image_path}")
-            sheet_name, df = extraire_table_depuis_image(image_path)
-            df.to_excel(writer, sheet_name=sheet_name, index=False)
+# Images spread on the shared OCR pool, sheets written in the order of image_paths
+def extraire_plusieurs_images(image_paths, output_excel="ocr_grid_output.xlsx", progression=None):
+    def traiter(image_path):
+        print(f"🔍 Traitement : {image_path}")
+        return extraire_table_depuis_image(image_path, output_excel=None)
+
+    resultats = executeur_partage().map(traiter, image_paths, progression=progression)
+
+    with ExportExcel(output_excel) as export:
+        for image_path, resultat in zip(image_paths, resultats):
+            if resultat is None:
+                continue
+            sheet_name, df = resultat
+            sheet_name = export.ajouter_feuille(sheet_name, df)
             print(f"✅ Feuille ajoutée : {sheet_name}")
     print(f"\n📁 Fichier Excel généré : {output_excel}")
 
@@ -0,0 +1,44 @@
+import fitz  # PyMuPDF
+
+from page_classifier import PAGE_TEXTE, PAGE_VECTORIELLE, classer_type_page
+
+
+# === Page type of generated pages (rulings drawn as lines or rectangles) ===
+#
+def page_generee(dessiner):
+    doc = fitz.open()
+    page = doc.new_page()
+    for i in range(30):
+        page.insert_text((60, 400 + i * 10), f"mot{i} texte")
+    dessiner(page)
+    return page
+
+
+def grille_cellules(page, x=50, y=100, nb_lignes=5, nb_colonnes=4, largeur=100, hauteur=15):
+    # One rectangle per cell, rows under LONGUEUR_MIN_LIGNE high
+    for i in range(nb_lignes):
+        for j in range(nb_colonnes):
+            page.draw_rect(fitz.Rect(x + j * largeur, y + i * hauteur, x + (j + 1) * largeur, y + (i + 1) * hauteur))
+            page.insert_text((x + 5 + j * largeur, y + 12 + i * hauteur), f"{i}.{j}", fontsize=8)
+
+
+def test_grille_de_rectangles_de_cellules():
+    assert classer_type_page(page_generee(grille_cellules)) == PAGE_VECTORIELLE
+
+
+def test_un_rectangle_par_ligne():
+    def lignes(page):
+        for i in range(5):
+            page.draw_rect(fitz.Rect(50, 100 + i * 15, 450, 115 + i * 15))
+    assert classer_type_page(page_generee(lignes)) == PAGE_VECTORIELLE
+
+
+def test_grille_dans_un_cadre():
+    def cadre_et_grille(page):
+        page.draw_rect(fitz.Rect(30, 30, 560, 800))
+        grille_cellules(page)
+    assert classer_type_page(page_generee(cadre_et_grille)) == PAGE_VECTORIELLE
+
+
+def test_cadre_de_page_seul():
+    assert classer_type_page(page_generee(lambda page: page.draw_rect(fitz.Rect(30, 30, 560, 800)))) == PAGE_TEXTE
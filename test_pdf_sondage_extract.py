@@ -0,0 +1,43 @@
+import fitz  # PyMuPDF
+
+from pdf_sondage_extract import KEYWORDS, PDFKeywordExtractor
+from word_index import IndexMots
+from word_source import SourceMotsPyMuPDF
+
+
+# === Depth column of a generated borehole report ===
+#
+def rapport(chemin, x_profondeurs):
+    # SP1 page : "Profondeur" header (~55 pt wide) at x=50, depth values written from x_profondeurs
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((50, 40), "SP1")
+    for x, entete in [(50, "Profondeur"), (160, "Pf*"), (260, "Pl*"), (360, "Module")]:
+        page.insert_text((x, 80), entete)
+    for i in range(5):
+        y = 150 + i * 20
+        for x, valeur in [(x_profondeurs, f"{i + 1},00"), (162, f"0,{5 + i}"), (262, f"1,{i}"), (370, f"{10 + i}")]:
+            page.insert_text((x, y), valeur)
+    doc.save(chemin)
+
+
+def profondeurs(chemin):
+    with SourceMotsPyMuPDF(str(chemin)) as source:
+        mots = IndexMots(source.mots(0))
+    return PDFKeywordExtractor(str(chemin), KEYWORDS).extract_depth_column(mots)
+
+
+def test_profondeurs_alignees_a_gauche(tmp_path):
+    rapport(tmp_path / "gauche.pdf", x_profondeurs=50)
+    assert profondeurs(tmp_path / "gauche.pdf") == [1.0, 2.0, 3.0, 4.0, 5.0]
+
+
+def test_profondeurs_alignees_a_droite(tmp_path):
+    rapport(tmp_path / "droite.pdf", x_profondeurs=88)
+    assert profondeurs(tmp_path / "droite.pdf") == [1.0, 2.0, 3.0, 4.0, 5.0]
+
+
+def test_colonne_voisine_non_prise(tmp_path):
+    # Pf* values (x=162) are not taken as depths when the depth column is empty
+    rapport(tmp_path / "vide.pdf", x_profondeurs=500)
+    assert profondeurs(tmp_path / "vide.pdf") == []
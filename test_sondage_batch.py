@@ -0,0 +1,44 @@
+from pdf_sondage_extract import add_page_result
+from sondage_batch import fusionner_resultats
+
+
+# === Merge of the page results of the borehole extraction (no PDF needed) ===
+#
+def page(pdf, page_idx, sondage, valeurs, red):
+    return {
+        "pdf": pdf,
+        "page": page_idx,
+        "sondage": sondage,
+        "Pf*": list(valeurs),
+        "Pl*": list(valeurs),
+        "Module": list(valeurs),
+        "RedFlags": {"Pf*": list(red), "Pl*": list(red), "Module": []},
+        "Logs": [],
+        "DepthDetected": [],
+    }
+
+
+def test_redflags_decales_par_les_valeurs_deja_fusionnees():
+    results = {}
+    add_page_result(results, page("a.pdf", 0, "SP1", [1.0, 2.0, None, 3.0], [0, 1]))
+    add_page_result(results, page("a.pdf", 1, "SP1", [4.0, 5.0, 6.0], [1, 2]))
+
+    data = results["SP1"]
+    assert data["Pf*"] == [1.0, 2.0, None, 3.0, 4.0, 5.0, 6.0]
+    assert data["RedFlags"]["Pf*"] == [0, 1, 5, 6]
+    assert [data["Pf*"][i] for i in data["RedFlags"]["Pf*"]] == [1.0, 2.0, 5.0, 6.0]
+    assert data["RedFlags"]["Module"] == []
+    assert data["Pages"] == [["a.pdf", 1], ["a.pdf", 2]]
+
+
+def test_fusion_deterministe_par_pdf_puis_page():
+    # Page results of a task given in any order : merged by PDF order, then page order
+    pages_a = [page("a.pdf", 3, "SP2", [7.0, 8.0], [0, 1]), page("a.pdf", 1, "SP2", [5.0, 6.0], [])]
+    pages_b = [page("b.pdf", 0, "SP2", [9.0], [0]), page("b.pdf", 2, "Page 3", [1.0], [])]
+    results = fusionner_resultats([("dossier/a.pdf", pages_a), ("dossier/b.pdf", pages_b)])
+
+    assert list(results) == ["SP2", "b - Page 3"]
+    data = results["SP2"]
+    assert data["Pf*"] == [5.0, 6.0, 7.0, 8.0, 9.0]
+    assert data["RedFlags"]["Pf*"] == [2, 3, 4]
+    assert data["Pages"] == [["a.pdf", 2], ["a.pdf", 4], ["b.pdf", 1]]
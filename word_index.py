@@ -0,0 +1,62 @@
+import re
+
+import numpy as np
+
+
+# === Script : WORD INDEX OF A PAGE ===
+# = Built once per page from the words (x0 / x1 / top / text) : centers, tops, numeric values and
+#   lowercase texts in NumPy arrays + first word of each text -> the keyword / column queries
+#   are mask operations instead of one scan of the page per keyword
+# = Numeric value = float(text with "," -> "."), parsed once per word (NaN + numerique False otherwise)
+#
+# float() can only succeed with a digit or an inf / nan spelling : the other words skip the try / except
+_PEUT_ETRE_NOMBRE = re.compile(r"\d|inf|nan", re.IGNORECASE)
+
+
+def _nombre(texte):
+    if not _PEUT_ETRE_NOMBRE.search(texte):
+        return None
+    try:
+        return float(texte.replace(",", "."))
+    except ValueError:
+        return None
+
+
+class IndexMots:
+    def __init__(self, words):
+        self.words = words
+        n = len(words)
+        self.textes = [w['text'].strip() for w in words]
+        self.x_centre = np.fromiter(((w['x0'] + w['x1']) / 2 for w in words), dtype=float, count=n)
+        self.top = np.fromiter((w['top'] for w in words), dtype=float, count=n)
+
+        valeurs = [_nombre(w['text']) for w in words]
+        self.numerique = np.fromiter((v is not None for v in valeurs), dtype=bool, count=n)
+        self.valeurs = np.array([np.nan if v is None else v for v in valeurs], dtype=float)
+
+        # Lowercase text -> index of its first word on the page
+        self.premier = {}
+        for i, texte in enumerate(self.textes):
+            self.premier.setdefault(texte.lower(), i)
+
+    def __len__(self):
+        return len(self.words)
+
+    def chercher(self, texte):
+        # Index of the first word equal to texte (case-insensitive), None if absent
+        return self.premier.get(texte.lower())
+
+    def premier_motif(self, pattern):
+        # First word (stripped) matching the compiled regex entirely
+        return next((t for t in self.textes if pattern.fullmatch(t)), None)
+
+    def valeurs_colonne(self, x_ref, y_min, gauche, droite):
+        """
+        Valeurs numériques dont le centre est dans [x_ref - gauche, x_ref + droite] et le top > y_min,
+        triées par top : [(top, valeur)].
+        """
+        masque = self.numerique & (self.x_centre >= x_ref - gauche) & (self.x_centre <= x_ref + droite) \
+            & (self.top > y_min)
+        idx = np.flatnonzero(masque)
+        idx = idx[np.argsort(self.top[idx], kind="stable")]
+        return list(zip(self.top[idx].tolist(), self.valeurs[idx].tolist()))
@@ -0,0 +1,160 @@
+import os
+import sys
+import time
+import argparse
+
+
+# === Script : WORD SOURCES FOR THE BOREHOLE EXTRACTOR ===
+# = Same contract for every source : one list per page of words {"text", "x0", "x1", "top", "bottom"}
+#   in PDF points, origin at the top-left corner of the page (as pdfplumber page.extract_words())
+# = "pymupdf"    : page.get_text("words"), C text extraction, much faster on long campaigns
+#   "pdfplumber" : pdfminer layout analysis in pure Python (previous behaviour, kept as fallback)
+# = Selection : ouvrir_source_mots(pdf, "pdfplumber") or EXTRACTPDF_WORD_SOURCE=pymupdf|pdfplumber|auto
+# = Benchmark : python word_source.py bench rapport1.pdf rapport2.pdf
+#
+SOURCE_MOTS = os.environ.get("EXTRACTPDF_WORD_SOURCE", "auto")
+
+
+class SourceMotsPyMuPDF:
+    nom = "pymupdf"
+
+    def __init__(self, pdf_path):
+        import fitz  # PyMuPDF
+        self._fitz = fitz
+        self.doc = fitz.open(pdf_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.fermer()
+        return False
+
+    def __len__(self):
+        return self.doc.page_count
+
+    def mots(self, page_idx):
+        page = self.doc.load_page(page_idx)
+        # Glyph boxes of font size height (as pdfminer) instead of ascender / descender : same top / bottom
+        # as pdfplumber to ~0.1 pt. Global PyMuPDF option -> put back right after
+        tools = self._fitz.TOOLS
+        precedent = tools.set_small_glyph_heights()
+        tools.set_small_glyph_heights(True)
+        try:
+            # (x0, y0, x1, y1, word, block_no, line_no, word_no), y from the top of the page
+            mots = page.get_text("words", sort=True)
+        finally:
+            tools.set_small_glyph_heights(precedent)
+        return [{"text": texte, "x0": x0, "x1": x1, "top": y0, "bottom": y1} for x0, y0, x1, y1, texte, *_ in mots]
+
+    def pages(self):
+        for page_idx in range(len(self)):
+            yield page_idx, self.mots(page_idx)
+
+    def fermer(self):
+        self.doc.close()
+
+
+class SourceMotsPdfplumber:
+    nom = "pdfplumber"
+
+    def __init__(self, pdf_path):
+        import pdfplumber
+        self.pdf = pdfplumber.open(pdf_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.fermer()
+        return False
+
+    def __len__(self):
+        return len(self.pdf.pages)
+
+    def mots(self, page_idx):
+        page = self.pdf.pages[page_idx]
+        mots = page.extract_words()
+        page.flush_cache()  # pdfminer objects of the page not kept until the end of the document
+        return mots
+
+    def pages(self):
+        for page_idx in range(len(self)):
+            yield page_idx, self.mots(page_idx)
+
+    def fermer(self):
+        self.pdf.close()
+
+
+SOURCES = {
+    "pymupdf": SourceMotsPyMuPDF,
+    "pdfplumber": SourceMotsPdfplumber,
+}
+
+
+def ouvrir_source_mots(pdf_path, nom=None):
+    # "auto" : PyMuPDF if installed, pdfplumber otherwise
+    nom = nom or SOURCE_MOTS
+    if nom == "auto":
+        try:
+            return SourceMotsPyMuPDF(pdf_path)
+        except ImportError:
+            return SourceMotsPdfplumber(pdf_path)
+
+    if nom not in SOURCES:
+        raise ValueError(f"Source de mots inconnue : {nom} (choix : {', '.join(SOURCES)}, auto)")
+    return SOURCES[nom](pdf_path)
+
+
+# === Benchmark : time per page + same words found by both sources ===
+def _cles_mots(mots, precision=1):
+    # Word positions rounded : small differences of glyph boxes between the two libraries ignored
+    return {(m["text"], round(m["x0"] / precision), round(m["top"] / precision)) for m in mots}
+
+
+def benchmark(pdf_paths, max_pages=None):
+    resultats = {}
+    for pdf_path in pdf_paths:
+        print(f"\n📄 {os.path.basename(pdf_path)}")
+        mots_par_source = {}
+        for nom, classe in SOURCES.items():
+            try:
+                source = classe(pdf_path)
+            except ImportError:
+                print(f"⚠️ {nom} non installé, ignoré")
+                continue
+            with source:
+                nb_pages = min(len(source), max_pages or len(source))
+                debut = time.perf_counter()
+                mots_par_source[nom] = [source.mots(i) for i in range(nb_pages)]
+                duree = time.perf_counter() - debut
+            nb_mots = sum(len(m) for m in mots_par_source[nom])
+            resultats.setdefault(pdf_path, {})[nom] = duree
+            print(f"⏱ {nom:<10} : {duree:.2f} s ({duree / max(1, nb_pages) * 1000:.1f} ms / page, {nb_mots} mots)")
+
+        if len(mots_par_source) == 2:
+            communs = total = 0
+            for mots_a, mots_b in zip(*mots_par_source.values()):
+                a, b = _cles_mots(mots_a, precision=2), _cles_mots(mots_b, precision=2)
+                communs += len(a & b)
+                total += len(a | b)
+            durees = resultats[pdf_path]
+            print(f"🔁 Mots identiques : {communs}/{total} ({communs / max(1, total):.1%}), "
+                  f"gain x{durees['pdfplumber'] / max(durees['pymupdf'], 1e-9):.1f}")
+    return resultats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sources de mots PDF")
+    sub = parser.add_subparsers(dest="action", required=True)
+    bench = sub.add_parser("bench", help="Compare PyMuPDF et pdfplumber sur des rapports PDF")
+    bench.add_argument("pdf", nargs="+")
+    bench.add_argument("--max-pages", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    if args.action == "bench":
+        benchmark(args.pdf, max_pages=args.max_pages)
+
+
+if __name__ == "__main__":
+    sys.exit(main())